@@ -3,10 +3,19 @@ Configuración centralizada para ZeepubsBot.
 Maneja todas las constantes, configuraciones de API y logging.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import re
 from dataclasses import dataclass
-from typing import Optional
+from types import SimpleNamespace
+from typing import Dict, Pattern
+
+
+# Snapshot del entorno tomado una sola vez al importar el módulo
+_ENV: Dict[str, str] = dict(os.environ)
 
 
 @dataclass(frozen=True)
@@ -33,83 +42,113 @@ class BotConfig:
     max_message_length: int
     max_caption_length: int
 
+    # Concurrencia de acceso a base de datos desde los handlers
+    db_concurrency: int
 
-class ConfigManager:
-    """Gestor de configuración del bot."""
-
-    _instance: Optional['ConfigManager'] = None
-    _config: Optional[BotConfig] = None
-
-    def __new__(cls) -> 'ConfigManager':
-        """Implementa patrón Singleton para configuración global."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self) -> None:
-        """Inicializa el gestor si no está configurado."""
-        if self._config is None:
-            self._config = self._load_config()
-            self._setup_logging()
-
-    def _load_config(self) -> BotConfig:
-        """Carga configuración desde variables de entorno."""
-        return BotConfig(
-            telegram_token=self._get_required_env("ZEEPUBSBOT_TOKEN"),
-            deepseek_api_key=self._get_required_env("DEEPSEEK_TOKEN"),
-            developer_chat_id=int(self._get_env("DEVELOPER_CHAT_ID", "706229521")),
-            books_per_page=int(self._get_env("BOOKS_PER_PAGE", "10")),
-            deepseek_endpoint=self._get_env("DEEPSEEK_ENDPOINT", "https://api.deepseek.com"),
-            api_timeout=int(self._get_env("API_TIMEOUT", "30")),
-            max_message_length=int(self._get_env("MAX_MESSAGE_LENGTH", "4096")),
-            max_caption_length=int(self._get_env("MAX_CAPTION_LENGTH", "1024"))
-        )
+    # Journal WAL2 de SQLite (solo si la compilación lo soporta)
+    db_enable_wal2: bool
 
-    def _get_required_env(self, key: str) -> str:
-        """Obtiene variable de entorno requerida."""
-        value = os.getenv(key)
-        if not value:
-            raise ValueError(f"Variable de entorno requerida no encontrada: {key}")
-        return value
 
-    def _get_env(self, key: str, default: str) -> str:
-        """Obtiene variable de entorno con valor por defecto."""
-        return os.getenv(key, default)
+def _get_required_env(key: str) -> str:
+    """Obtiene variable de entorno requerida."""
+    value = _ENV.get(key)
+    if not value:
+        raise ValueError(f"Variable de entorno requerida no encontrada: {key}")
+    return value
 
-    def _setup_logging(self) -> None:
-        logger = logging.getLogger("zeepubs_bot")
-        logger.setLevel(logging.INFO)
 
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        ))
+def _get_env(key: str, default: str) -> str:
+    """Obtiene variable de entorno con valor por defecto."""
+    return _ENV.get(key, default)
 
-        logger.addHandler(stream_handler)
 
-    @property
-    def config(self) -> BotConfig:
-        """Retorna la configuración actual."""
-        return self._config
+def _build_config() -> BotConfig:
+    """Carga configuración desde variables de entorno."""
+    return BotConfig(
+        telegram_token=_get_required_env("ZEEPUBSBOT_TOKEN"),
+        deepseek_api_key=_get_required_env("DEEPSEEK_TOKEN"),
+        developer_chat_id=int(_get_env("DEVELOPER_CHAT_ID", "706229521")),
+        books_per_page=int(_get_env("BOOKS_PER_PAGE", "10")),
+        deepseek_endpoint=_get_env("DEEPSEEK_ENDPOINT", "https://api.deepseek.com"),
+        api_timeout=int(_get_env("API_TIMEOUT", "30")),
+        max_message_length=int(_get_env("MAX_MESSAGE_LENGTH", "4096")),
+        max_caption_length=int(_get_env("MAX_CAPTION_LENGTH", "1024")),
+        db_concurrency=int(_get_env("DB_CONCURRENCY", "8")),
+        db_enable_wal2=_get_env("DB_ENABLE_WAL2", "false").lower() in ("1", "true", "yes")
+    )
 
-    def get_logger(self, name: str) -> logging.Logger:
-        """Retorna un logger configurado."""
-        return logging.getLogger(name)
 
-
-# Instancia global del gestor de configuración
-config_manager = ConfigManager()
+# Configuración global, resuelta una sola vez al importar el módulo
+CONFIG: BotConfig = _build_config()
 
 
 # Acceso directo a la configuración
 def get_config() -> BotConfig:
     """Retorna la configuración del bot."""
-    return config_manager.config
+    return CONFIG
 
 
 def get_logger(name: str) -> logging.Logger:
     """Retorna un logger configurado."""
-    return config_manager.get_logger(name)
+    return logging.getLogger(name)
+
+
+# Compatibilidad con el antiguo ConfigManager: config_manager.config y get_logger()
+config_manager = SimpleNamespace(config=CONFIG, get_logger=get_logger)
+
+
+_logging_configured = False
+
+
+def configure_logging() -> None:
+    """
+    Configura los handlers de logging del bot.
+
+    Se invoca desde el punto de entrada y no al importar el módulo. Los
+    registros se encolan con un QueueHandler y un QueueListener en segundo
+    plano los escribe, de modo que el event loop nunca bloquea en disco.
+    El archivo se abre con delay=True y se escribe por lotes a través de un
+    MemoryHandler que vacía el buffer al llenarse o ante un WARNING.
+    """
+    global _logging_configured
+
+    if _logging_configured:
+        return
+
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    file_handler = logging.FileHandler(BotConstants.LOG_FILE, encoding="utf-8", delay=True)
+    file_handler.setFormatter(formatter)
+
+    memory_handler = logging.handlers.MemoryHandler(
+        BotConstants.LOG_BUFFER_CAPACITY,
+        flushLevel=logging.WARNING,
+        target=file_handler
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, memory_handler, respect_handler_level=True
+    )
+    listener.start()
+
+    logger = logging.getLogger("zeepubs_bot")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    def _stop_listener() -> None:
+        """Drena la cola y vacía el buffer pendiente al salir."""
+        listener.stop()
+        memory_handler.close()
+        file_handler.close()
+
+    atexit.register(_stop_listener)
+    _logging_configured = True
 
 
 # Constantes del bot
@@ -123,11 +162,14 @@ class BotConstants:
     # Patrones de callback
     CHARACTER_PATTERN = "^character"
     DOWNLOAD_PATTERN = r"download "
+    CHARACTER_RE: Pattern[str] = re.compile(CHARACTER_PATTERN)
+    DOWNLOAD_RE: Pattern[str] = re.compile(DOWNLOAD_PATTERN)
 
     # Archivos de configuración
     MESSAGES_FILE = "mensajes.json"
     DATABASE_FILE = "books.db"
     LOG_FILE = "zeepubsbot.log"
+    LOG_BUFFER_CAPACITY = 1024
 
     # Extensiones de archivo
     EPUB_EXTENSION = ".epub"
@@ -136,3 +178,7 @@ class BotConstants:
     TITLE_TRUNCATE_LENGTH = 40
     TITLE_PARTS_LENGTH = 20
     DESCRIPTION_PREVIEW_LENGTH = 1019
+
+    # Cachés
+    STATS_CACHE_TTL = 60  # segundos que se reutilizan las estadísticas de /about
+    SEARCH_CACHE_SIZE = 64  # búsquedas de /ebook recordadas para paginar
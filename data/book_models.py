@@ -3,10 +3,13 @@ Modelos de datos para ZeepubsBot.
 Define estructuras de datos, validaciones y reglas de negocio.
 """
 
+import functools
+import operator
 import re
+import time
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import AbstractSet, Dict, Any, Optional, List
 from enum import Enum
 
 from config.bot_config import get_logger
@@ -14,6 +17,57 @@ from data.database_config import DatabaseConstants
 from utils.error_handler import log_service_error
 
 
+# Patrones precompilados para limpieza y validación
+_WS_RE = re.compile(r'\s+')
+_TEXT_CLEAN_RE = re.compile(r'(\s+)|[^\w\s\-\.,;:!?()\'"áéíóúñüÁÉÍÓÚÑÜ]+')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_FILE_ID_RE = re.compile(r'^[a-zA-Z0-9\-_]{10,}$')
+
+# Tabla para eliminar guiones y espacios de un ISBN (todo espacio Unicode es < U+3001)
+_ISBN_STRIP_TABLE = dict.fromkeys(
+    [ord('-'), *(codepoint for codepoint in range(0x3001) if chr(codepoint).isspace())]
+)
+
+
+def _clean_text_match(match: 're.Match[str]') -> str:
+    """Normaliza espacios a uno solo y descarta caracteres no permitidos."""
+    return ' ' if match.group(1) else ''
+
+
+def _is_valid_book_id(book_id: Optional[str]) -> bool:
+    """Verifica longitud y formato alfanumérico ASCII de book_id en un solo paso."""
+    return bool(
+        book_id
+        and DatabaseConstants.MIN_BOOK_ID_LENGTH <= len(book_id) <= DatabaseConstants.MAX_BOOK_ID_LENGTH
+        and book_id.isascii()
+        and book_id.isalnum()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _max_year_for_day(day: int) -> int:
+    """Año máximo válido, recalculado una sola vez por día."""
+    return datetime.now().year + 1
+
+
+def _max_valid_year() -> int:
+    """Retorna el año máximo aceptado para publicaciones."""
+    return _max_year_for_day(int(time.time() // 86400))
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parsea fecha ISO; los timestamps se repiten mucho entre filas de un lote."""
+    return datetime.fromisoformat(value)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """Normaliza fecha de BD/diccionario (str ISO, datetime o vacío)."""
+    if not value:
+        return None
+    return _parse_iso_datetime(value) if isinstance(value, str) else value
+
+
 class BookLanguage(Enum):
     """Idiomas soportados para libros (sincronizado con BD)."""
     SPANISH = "es"
@@ -36,7 +90,22 @@ class BookType(Enum):
     OTHER = "other"
 
 
-@dataclass
+# Valores válidos para verificación de pertenencia O(1)
+_VALID_LANGUAGE_VALUES = frozenset(language.value for language in BookLanguage)
+_VALID_TYPE_VALUES = frozenset(type_.value for type_ in BookType)
+
+# Conversión valor -> miembro sin pasar por Enum.__call__
+_LANGUAGE_BY_VALUE = {language.value: language for language in BookLanguage}
+_TYPE_BY_VALUE = {type_.value: type_ for type_ in BookType}
+
+
+# Campos de BookMetadata sujetos a limpieza/validación
+_METADATA_FIELDS = frozenset({
+    'title', 'author', 'description', 'alt_title', 'language', 'type', 'isbn', 'publisher', 'year'
+})
+
+
+@dataclass(slots=True)
 class BookMetadata:
     """Metadatos completos de un libro."""
     title: str
@@ -51,23 +120,31 @@ class BookMetadata:
 
     def __post_init__(self):
         """Validación y limpieza después de inicialización."""
-        self.title = self._clean_text(self.title)
-        self.author = self._clean_text(self.author)
-        self.description = self._clean_description(self.description)
+        self._finalize(_METADATA_FIELDS)
+
+    def _finalize(self, changed: AbstractSet[str]) -> None:
+        """Limpia y valida únicamente los campos indicados."""
+        if 'title' in changed:
+            self.title = self._clean_text(self.title)
+
+        if 'author' in changed:
+            self.author = self._clean_text(self.author)
+
+        if 'description' in changed:
+            self.description = self._clean_description(self.description)
 
-        if self.alt_title:
+        if 'alt_title' in changed and self.alt_title:
             self.alt_title = self._clean_text(self.alt_title)
 
-        self._validate()
+        self._validate(changed)
 
     def _clean_text(self, text: str) -> str:
         """Limpia y normaliza texto usando límites de BD."""
         if not text:
             return ""
 
-        # Remover espacios excesivos y caracteres especiales
-        cleaned = re.sub(r'\s+', ' ', text.strip())
-        cleaned = re.sub(r'[^\w\s\-\.,;:!?()\'"áéíóúñüÁÉÍÓÚÑÜ]', '', cleaned)
+        # Remover espacios excesivos y caracteres especiales en una sola pasada
+        cleaned = _TEXT_CLEAN_RE.sub(_clean_text_match, text.strip())
 
         # Usar límites de DatabaseConstants
         max_length = DatabaseConstants.MAX_TITLE_LENGTH
@@ -79,10 +156,10 @@ class BookMetadata:
             return ""
 
         # Remover tags HTML
-        cleaned = re.sub(r'<[^>]+>', '', description)
+        cleaned = _HTML_TAG_RE.sub('', description)
 
         # Normalizar espacios
-        cleaned = re.sub(r'\s+', ' ', cleaned.strip())
+        cleaned = _WS_RE.sub(' ', cleaned.strip())
 
         # Limitar longitud usando DatabaseConstants
         max_length = DatabaseConstants.MAX_DESCRIPTION_LENGTH
@@ -91,56 +168,66 @@ class BookMetadata:
 
         return cleaned
 
-    def _validate(self):
-        """Valida los datos del modelo contra constrains de BD."""
-        if not self.title or len(self.title.strip()) == 0:
-            raise ValueError("El título es requerido")
+    def _validate(self, fields: Optional[AbstractSet[str]] = None):
+        """Valida los datos del modelo contra constrains de BD (todos o solo `fields`)."""
+        if fields is None:
+            fields = _METADATA_FIELDS
 
-        if not self.author or len(self.author.strip()) == 0:
-            raise ValueError("El autor es requerido")
+        if 'title' in fields:
+            if not self.title or len(self.title.strip()) == 0:
+                raise ValueError("El título es requerido")
 
-        # Validar longitudes contra DatabaseConstants
-        if len(self.title) > DatabaseConstants.MAX_TITLE_LENGTH:
-            raise ValueError(f"Título excede {DatabaseConstants.MAX_TITLE_LENGTH} caracteres")
+            # Validar longitudes contra DatabaseConstants
+            if len(self.title) > DatabaseConstants.MAX_TITLE_LENGTH:
+                raise ValueError(f"Título excede {DatabaseConstants.MAX_TITLE_LENGTH} caracteres")
 
-        if len(self.author) > DatabaseConstants.MAX_AUTHOR_LENGTH:
-            raise ValueError(f"Autor excede {DatabaseConstants.MAX_AUTHOR_LENGTH} caracteres")
+        if 'author' in fields:
+            if not self.author or len(self.author.strip()) == 0:
+                raise ValueError("El autor es requerido")
 
-        if self.description and len(self.description) > DatabaseConstants.MAX_DESCRIPTION_LENGTH:
-            raise ValueError(f"Descripción excede {DatabaseConstants.MAX_DESCRIPTION_LENGTH} caracteres")
+            if len(self.author) > DatabaseConstants.MAX_AUTHOR_LENGTH:
+                raise ValueError(f"Autor excede {DatabaseConstants.MAX_AUTHOR_LENGTH} caracteres")
+
+        if 'description' in fields:
+            if self.description and len(self.description) > DatabaseConstants.MAX_DESCRIPTION_LENGTH:
+                raise ValueError(f"Descripción excede {DatabaseConstants.MAX_DESCRIPTION_LENGTH} caracteres")
 
         # Validar año
-        if self.year and (self.year < 1000 or self.year > datetime.now().year + 1):
-            raise ValueError(f"Año inválido: {self.year}")
+        if 'year' in fields:
+            if self.year and (self.year < 1000 or self.year > _max_valid_year()):
+                raise ValueError(f"Año inválido: {self.year}")
 
         # Validar ISBN
-        if self.isbn and not self._validate_isbn(self.isbn):
-            raise ValueError(f"ISBN inválido: {self.isbn}")
+        if 'isbn' in fields:
+            if self.isbn and not self._validate_isbn(self.isbn):
+                raise ValueError(f"ISBN inválido: {self.isbn}")
 
         # Validar que language y type sean válidos para BD
-        if self.language.value not in ['es', 'en', 'fr', 'de', 'it', 'pt', 'unknown']:
-            raise ValueError(f"Idioma no soportado: {self.language.value}")
+        if 'language' in fields:
+            if self.language.value not in _VALID_LANGUAGE_VALUES:
+                raise ValueError(f"Idioma no soportado: {self.language.value}")
 
-        if self.type.value not in ['book', 'novel', 'essay', 'manual', 'comic', 'magazine', 'other']:
-            raise ValueError(f"Tipo no soportado: {self.type.value}")
+        if 'type' in fields:
+            if self.type.value not in _VALID_TYPE_VALUES:
+                raise ValueError(f"Tipo no soportado: {self.type.value}")
 
     def _validate_isbn(self, isbn: str) -> bool:
         """Valida formato de ISBN."""
         # Remover guiones y espacios
-        clean_isbn = re.sub(r'[\s\-]', '', isbn)
+        clean_isbn = isbn.translate(_ISBN_STRIP_TABLE)
 
-        # Verificar longitud (ISBN-10 o ISBN-13)
-        if len(clean_isbn) not in [10, 13]:
-            return False
+        # ISBN-13: solo dígitos
+        if len(clean_isbn) == 13:
+            return clean_isbn.isdecimal()
 
-        # Verificar que sean solo números (excepto X en ISBN-10)
-        if not re.match(r'^\d{9}[\dX]$|^\d{13}$', clean_isbn):
-            return False
+        # ISBN-10: nueve dígitos y dígito de control numérico o X
+        if len(clean_isbn) == 10:
+            return clean_isbn[:9].isdecimal() and (clean_isbn[9] == 'X' or clean_isbn[9].isdecimal())
 
-        return True
+        return False
 
 
-@dataclass
+@dataclass(slots=True)
 class TelegramFileInfo:
     """Información de archivos en Telegram."""
     file_id: str
@@ -155,11 +242,31 @@ class TelegramFileInfo:
             raise ValueError("file_id es requerido")
 
         # Validar formato básico de file_id de Telegram
-        if not re.match(r'^[a-zA-Z0-9\-_]{10,}$', self.file_id):
+        if not _FILE_ID_RE.match(self.file_id):
             raise ValueError("Formato de file_id inválido")
 
 
-@dataclass
+# Campos de Book.to_dict que se copian tal cual (las fechas se serializan aparte)
+_BOOK_DICT_KEYS = (
+    'id', 'book_id', 'title', 'alt_title', 'author', 'description', 'language',
+    'type', 'isbn', 'publisher', 'year', 'file_id', 'cover_id', 'file_size'
+)
+_BOOK_DICT_GETTER = operator.attrgetter(*_BOOK_DICT_KEYS)
+
+# Columnas del SELECT de libros usado por Book.from_row (en orden)
+_BOOK_ROW_COLUMNS = (
+    'id', 'book_id', 'title', 'alt_title', 'author', 'description', 'language',
+    'type', 'file_id', 'cover_id', 'isbn', 'publisher', 'year', 'file_size',
+    'created_at', 'updated_at'
+)
+_BOOK_ROW_WIDTH = len(_BOOK_ROW_COLUMNS)
+
+# Orden de los campos en las tuplas legacy
+_LEGACY_COLUMNS = _BOOK_ROW_COLUMNS[:14]
+_LEGACY_ATTRGETTER = operator.attrgetter(*_LEGACY_COLUMNS)
+
+
+@dataclass(slots=True)
 class Book:
     """Modelo principal de libro sincronizado con schema de BD."""
     book_id: str
@@ -169,13 +276,34 @@ class Book:
     id: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    # Portada extraída del EPUB, pendiente de subir (uso temporal de file_manager)
+    _cover_data: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    # Acceso directo a metadatos y archivo, copiado en _sync_fields()
+    title: str = field(init=False, repr=False, compare=False)
+    author: str = field(init=False, repr=False, compare=False)
+    description: str = field(init=False, repr=False, compare=False)
+    alt_title: Optional[str] = field(init=False, repr=False, compare=False)
+    language: str = field(init=False, repr=False, compare=False)
+    type: str = field(init=False, repr=False, compare=False)
+    isbn: Optional[str] = field(init=False, repr=False, compare=False)
+    publisher: Optional[str] = field(init=False, repr=False, compare=False)
+    year: Optional[int] = field(init=False, repr=False, compare=False)
+    file_id: Optional[str] = field(init=False, repr=False, compare=False)
+    file_size: Optional[int] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Validación del modelo principal."""
+        if not _is_valid_book_id(self.book_id):
+            self._raise_invalid_book_id()
+
+        self._sync_fields()
+
+    def _raise_invalid_book_id(self) -> None:
+        """Lanza ValueError con el motivo por el que book_id es inválido."""
         if not self.book_id or len(self.book_id.strip()) == 0:
             raise ValueError("book_id es requerido")
 
-        # Validar formato de book_id usando DatabaseConstants
         if (len(self.book_id) < DatabaseConstants.MIN_BOOK_ID_LENGTH or
             len(self.book_id) > DatabaseConstants.MAX_BOOK_ID_LENGTH):
             raise ValueError(
@@ -183,65 +311,24 @@ class Book:
                 f"y {DatabaseConstants.MAX_BOOK_ID_LENGTH} caracteres"
             )
 
-        # Validar formato alfanumérico
-        if not re.match(r'^[a-zA-Z0-9]{5,20}$', self.book_id):
-            raise ValueError("book_id debe ser alfanumérico")
-
-    # Properties para acceso directo a metadatos
-    @property
-    def title(self) -> str:
-        """Título principal del libro."""
-        return self.metadata.title
-
-    @property
-    def author(self) -> str:
-        """Autor del libro."""
-        return self.metadata.author
-
-    @property
-    def description(self) -> str:
-        """Descripción del libro."""
-        return self.metadata.description
-
-    @property
-    def alt_title(self) -> Optional[str]:
-        """Título alternativo."""
-        return self.metadata.alt_title
-
-    @property
-    def language(self) -> str:
-        """Idioma como string."""
-        return self.metadata.language.value
-
-    @property
-    def type(self) -> str:
-        """Tipo como string."""
-        return self.metadata.type.value
-
-    @property
-    def isbn(self) -> Optional[str]:
-        """ISBN del libro."""
-        return self.metadata.isbn
-
-    @property
-    def publisher(self) -> Optional[str]:
-        """Editorial del libro."""
-        return self.metadata.publisher
-
-    @property
-    def year(self) -> Optional[int]:
-        """Año de publicación."""
-        return self.metadata.year
-
-    @property
-    def file_id(self) -> Optional[str]:
-        """ID del archivo en Telegram."""
-        return self.file_info.file_id if self.file_info else None
-
-    @property
-    def file_size(self) -> Optional[int]:
-        """Tamaño del archivo en bytes."""
-        return self.file_info.file_size if self.file_info else None
+        raise ValueError("book_id debe ser alfanumérico")
+
+    def _sync_fields(self) -> None:
+        """Copia metadatos e info de archivo a atributos planos del libro."""
+        metadata = self.metadata
+        self.title = metadata.title
+        self.author = metadata.author
+        self.description = metadata.description
+        self.alt_title = metadata.alt_title
+        self.language = metadata.language.value
+        self.type = metadata.type.value
+        self.isbn = metadata.isbn
+        self.publisher = metadata.publisher
+        self.year = metadata.year
+
+        file_info = self.file_info
+        self.file_id = file_info.file_id if file_info else None
+        self.file_size = file_info.file_size if file_info else None
 
     @property
     def has_cover(self) -> bool:
@@ -255,43 +342,14 @@ class Book:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el libro a diccionario para serialización/BD."""
-        return {
-            'id': self.id,
-            'book_id': self.book_id,
-            'title': self.title,
-            'alt_title': self.alt_title,
-            'author': self.author,
-            'description': self.description,
-            'language': self.language,
-            'type': self.type,
-            'isbn': self.isbn,
-            'publisher': self.publisher,
-            'year': self.year,
-            'file_id': self.file_id,
-            'cover_id': self.cover_id,
-            'file_size': self.file_size,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = dict(zip(_BOOK_DICT_KEYS, _BOOK_DICT_GETTER(self)))
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        data['updated_at'] = self.updated_at.isoformat() if self.updated_at else None
+        return data
 
     def to_legacy_tuple(self) -> tuple:
         """Convierte a tupla para compatibilidad con código existente."""
-        return (
-            self.id,
-            self.book_id,
-            self.title,
-            self.alt_title,
-            self.author,
-            self.description,
-            self.language,
-            self.type,
-            self.file_id,
-            self.cover_id,
-            self.isbn,
-            self.publisher,
-            self.year,
-            self.file_size
-        )
+        return _LEGACY_ATTRGETTER(self)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Book':
@@ -303,8 +361,8 @@ class Book:
                 author=data['author'],
                 description=data.get('description', ''),
                 alt_title=data.get('alt_title'),
-                language=BookLanguage(data.get('language', 'es')),
-                type=BookType(data.get('type', 'book')),
+                language=_LANGUAGE_BY_VALUE.get(data.get('language', 'es'), BookLanguage.UNKNOWN),
+                type=_TYPE_BY_VALUE.get(data.get('type', 'book'), BookType.OTHER),
                 isbn=data.get('isbn'),
                 publisher=data.get('publisher'),
                 year=data.get('year')
@@ -321,19 +379,8 @@ class Book:
                 )
 
             # Parsear fechas si existen
-            created_at = None
-            updated_at = None
-            if data.get('created_at'):
-                if isinstance(data['created_at'], str):
-                    created_at = datetime.fromisoformat(data['created_at'])
-                else:
-                    created_at = data['created_at']
-
-            if data.get('updated_at'):
-                if isinstance(data['updated_at'], str):
-                    updated_at = datetime.fromisoformat(data['updated_at'])
-                else:
-                    updated_at = data['updated_at']
+            created_at = _parse_datetime(data.get('created_at'))
+            updated_at = _parse_datetime(data.get('updated_at'))
 
             return cls(
                 book_id=data['book_id'] if 'book_id' in data else data['id'],
@@ -355,31 +402,7 @@ class Book:
     def from_row(cls, row) -> 'Book':
         """Crea libro desde fila de base de datos."""
         try:
-            # Convertir row a dict si es necesario
-            if hasattr(row, 'keys'):
-                data = dict(row)
-            else:
-                # Mapear tupla a estructura esperada (orden del SELECT)
-                data = {
-                    'id': row[0],
-                    'book_id': row[1],
-                    'title': row[2],
-                    'alt_title': row[3],
-                    'author': row[4],
-                    'description': row[5],
-                    'language': row[6] if len(row) > 6 else 'es',
-                    'type': row[7] if len(row) > 7 else 'book',
-                    'file_id': row[8] if len(row) > 8 else None,
-                    'cover_id': row[9] if len(row) > 9 else None,
-                    'isbn': row[10] if len(row) > 10 else None,
-                    'publisher': row[11] if len(row) > 11 else None,
-                    'year': row[12] if len(row) > 12 else None,
-                    'file_size': row[13] if len(row) > 13 else None,
-                    'created_at': row[14] if len(row) > 14 else None,
-                    'updated_at': row[15] if len(row) > 15 else None
-                }
-
-            return cls.from_dict(data)
+            return cls.from_dict(cls._row_to_dict(row))
 
         except Exception as e:
             logger = get_logger(__name__)
@@ -387,17 +410,60 @@ class Book:
             logger.error(f"Error creando libro desde fila de BD: {e}")
             raise ValueError(f"Fila de BD inválida: {e}")
 
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        """Convierte una fila de BD (Row o tupla) a diccionario."""
+        # Convertir row a dict si es necesario
+        if hasattr(row, 'keys'):
+            return dict(row)
+
+        # Completar la tupla una sola vez y desempaquetar (orden del SELECT)
+        if len(row) < _BOOK_ROW_WIDTH:
+            row = tuple(row) + (None,) * (_BOOK_ROW_WIDTH - len(row))
+
+        (id_, book_id, title, alt_title, author, description, language, type_,
+         file_id, cover_id, isbn, publisher, year, file_size,
+         created_at, updated_at) = row[:_BOOK_ROW_WIDTH]
+
+        return {
+            'id': id_,
+            'book_id': book_id,
+            'title': title,
+            'alt_title': alt_title,
+            'author': author,
+            'description': description,
+            'language': language or 'es',
+            'type': type_ or 'book',
+            'file_id': file_id,
+            'cover_id': cover_id,
+            'isbn': isbn,
+            'publisher': publisher,
+            'year': year,
+            'file_size': file_size,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+
     def update_metadata(self, **kwargs) -> None:
         """Actualiza metadatos del libro con validación."""
+        metadata = self.metadata
+        previous = {}
         try:
             for key, value in kwargs.items():
-                if hasattr(self.metadata, key):
-                    setattr(self.metadata, key, value)
+                if key in _METADATA_FIELDS:
+                    previous.setdefault(key, getattr(metadata, key))
+                    setattr(metadata, key, value)
 
-            # Re-validar después de actualización
-            self.metadata._validate()
+            # Limpiar y re-validar solo lo que cambió
+            metadata._finalize(previous.keys())
+            self._sync_fields()
 
         except Exception as e:
+            # Restaurar los metadatos previos para no dejarlos a medio validar
+            for key, value in previous.items():
+                setattr(metadata, key, value)
+            self._sync_fields()
+
             logger = get_logger(__name__)
             log_service_error("BookModels", e, {"book_id": self.book_id, "updates": kwargs})
             logger.error(f"Error actualizando metadatos: {e}")
@@ -412,6 +478,7 @@ class Book:
                 file_size=kwargs.get('file_size'),
                 mime_type=kwargs.get('mime_type', 'application/epub+zip')
             )
+            self._sync_fields()
 
         except Exception as e:
             logger = get_logger(__name__)
@@ -420,7 +487,7 @@ class Book:
             raise
 
 
-@dataclass
+@dataclass(slots=True)
 class BookStats:
     """Modelo para estadísticas de libros (tabla book_stats)."""
     book_id: str
@@ -464,7 +531,7 @@ class BookStats:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BookSearchResult:
     """Resultado de búsqueda de libros."""
     books: List[Book]
@@ -488,23 +555,22 @@ class BookSearchResult:
 
 
 class BookValidator:
-    """Validador especializado para libros usando DatabaseConstants."""
+    """
+    Validador especializado para libros usando DatabaseConstants.
+
+    Los validadores de campos simples se memoizan con lru_cache; si se
+    modifican los límites de DatabaseConstants en tiempo de ejecución hay
+    que invocar cache_clear() sobre cada uno.
+    """
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_book_id(book_id: str) -> bool:
         """Valida formato de book_id usando DatabaseConstants."""
-        if not book_id:
-            return False
-
-        # Validar longitud
-        if (len(book_id) < DatabaseConstants.MIN_BOOK_ID_LENGTH or
-            len(book_id) > DatabaseConstants.MAX_BOOK_ID_LENGTH):
-            return False
-
-        # Validar formato alfanumérico
-        return bool(re.match(r'^[a-zA-Z0-9]+$', book_id))
+        return _is_valid_book_id(book_id)
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_title(title: str) -> bool:
         """Valida título usando DatabaseConstants."""
         if not title or len(title.strip()) == 0:
@@ -513,6 +579,7 @@ class BookValidator:
         return len(title.strip()) <= DatabaseConstants.MAX_TITLE_LENGTH
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_author(author: str) -> bool:
         """Valida autor usando DatabaseConstants."""
         if not author or len(author.strip()) == 0:
@@ -529,13 +596,14 @@ class BookValidator:
         return len(description) <= DatabaseConstants.MAX_DESCRIPTION_LENGTH
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def validate_file_id(file_id: str) -> bool:
         """Valida file_id de Telegram."""
         if not file_id:
             return False
 
         # File IDs de Telegram son alfanuméricos con algunos caracteres especiales
-        return bool(re.match(r'^[a-zA-Z0-9\-_]{10,}$', file_id))
+        return bool(_FILE_ID_RE.match(file_id))
 
     @staticmethod
     def validate_complete_book(book: Book) -> List[str]:
@@ -559,10 +627,10 @@ class BookValidator:
                 errors.append("file_id inválido")
 
             # Validar enums
-            if book.language not in [lang.value for lang in BookLanguage]:
+            if book.language not in _VALID_LANGUAGE_VALUES:
                 errors.append("idioma no soportado")
 
-            if book.type not in [type_.value for type_ in BookType]:
+            if book.type not in _VALID_TYPE_VALUES:
                 errors.append("tipo no soportado")
 
         except Exception as e:
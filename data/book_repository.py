@@ -3,9 +3,18 @@ Repository para operaciones CRUD de libros.
 Implementa patrón Repository para acceso a datos de libros.
 """
 
+import functools
+import json
+import operator
+import sqlite3
+import threading
+import time
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+from cachetools import TTLCache
 
 from data.database_connection import get_database
 from data.database_config import DatabaseConstants
@@ -13,7 +22,268 @@ from config.bot_config import get_logger
 from utils.error_handler import log_service_error
 
 
-@dataclass
+# Columnas de books en orden fijo (ver Book._make); los valores por defecto
+# se resuelven en SQL para construir Book directamente desde la tupla
+_BOOK_COLUMNS = (
+    "id", "book_id", "title", "alt_title", "author",
+    "COALESCE({p}description, '') AS description",
+    "COALESCE({p}language, 'es') AS language",
+    "COALESCE({p}type, 'book') AS type",
+    "isbn", "publisher", "year", "file_id", "cover_id", "file_size",
+    "created_at", "updated_at"
+)
+
+
+def _book_columns_sql(prefix: str = "") -> str:
+    """Genera la lista de columnas del SELECT de books con prefijo de tabla opcional."""
+    return ", ".join(
+        column.format(p=prefix) if "{p}" in column else f"{prefix}{column}"
+        for column in _BOOK_COLUMNS
+    )
+
+
+_BOOK_COLUMNS_SQL = _book_columns_sql()
+_BOOK_COLUMNS_SQL_B = _book_columns_sql("b.")
+
+# Columnas escribibles de books; fijan el orden de placeholders y parámetros
+_WRITE_COLUMNS = (
+    "book_id", "title", "alt_title", "author", "description", "language", "type",
+    "isbn", "publisher", "year", "file_id", "cover_id", "file_size"
+)
+_UPDATE_COLUMNS = _WRITE_COLUMNS[1:]
+
+# Sentencias SQL fijas: el texto idéntico entre llamadas reutiliza la
+# sentencia preparada de la caché de sqlite3 en lugar de re-compilarla
+_SQL_INSERT_BOOK = (
+    f"INSERT INTO books ({', '.join(_WRITE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_WRITE_COLUMNS))})"
+)
+_INSERT_PARAMS_GETTER = operator.attrgetter(*_WRITE_COLUMNS)
+
+# INSERT ... RETURNING (SQLite >= 3.35) devuelve la fila creada sin releerla
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_SQL_INSERT_BOOK_RETURNING = f"{_SQL_INSERT_BOOK} RETURNING {_BOOK_COLUMNS_SQL}"
+
+_SQL_UPDATE_BOOK = (
+    f"UPDATE books SET {', '.join(f'{column} = ?' for column in _UPDATE_COLUMNS)}, "
+    "updated_at = CURRENT_TIMESTAMP WHERE book_id = ?"
+)
+_UPDATE_PARAMS_GETTER = operator.attrgetter(*_UPDATE_COLUMNS, "book_id")
+
+_SQL_FIND_BY_ID = f"SELECT {_BOOK_COLUMNS_SQL} FROM books WHERE id = ?"
+
+_SQL_FIND_BY_BOOK_ID = f"SELECT {_BOOK_COLUMNS_SQL} FROM books WHERE book_id = ?"
+
+# LIMIT -1 equivale a sin límite en SQLite
+_SQL_FIND_ALL_PAGED = f"SELECT {_BOOK_COLUMNS_SQL} FROM books ORDER BY title LIMIT ? OFFSET ?"
+
+# Pesos BM25 por columna: title, alt_title, author, description
+_SQL_SEARCH = f"""
+    SELECT {_BOOK_COLUMNS_SQL_B}
+    FROM books_fts
+    JOIN books b ON b.id = books_fts.rowid
+    WHERE books_fts MATCH ?
+    ORDER BY bm25(books_fts, 10.0, 5.0, 3.0, 1.0), b.title
+"""
+
+# Respaldo sin FTS: prefijos anclados (sargables con los índices NOCASE),
+# rango 1 título, 2 título alternativo, 3 autor
+_SQL_SEARCH_PREFIX = f"""
+    SELECT {_BOOK_COLUMNS_SQL_B}
+    FROM (
+        SELECT id, 1 AS rank FROM books WHERE title LIKE ?1 ESCAPE '\\'
+        UNION ALL
+        SELECT id, 2 FROM books WHERE alt_title LIKE ?1 ESCAPE '\\'
+        UNION ALL
+        SELECT id, 3 FROM books WHERE author LIKE ?1 ESCAPE '\\'
+    ) matches
+    JOIN books b ON b.id = matches.id
+    GROUP BY b.id
+    ORDER BY MIN(matches.rank), b.title
+"""
+
+# Coincidencias FTS ordenadas por título; el filtro de columna va en el MATCH
+_SQL_FTS_MATCH_ORDER_BY_TITLE = f"""
+    SELECT {_BOOK_COLUMNS_SQL_B}
+    FROM books_fts
+    JOIN books b ON b.id = books_fts.rowid
+    WHERE books_fts MATCH ?
+    ORDER BY b.title
+"""
+
+# Comparación NOCASE: usa los índices idx_books_*title_nocase
+_SQL_FIND_BY_TITLE_EXACT = f"""
+    SELECT {_BOOK_COLUMNS_SQL}
+    FROM books 
+    WHERE title = ?1 COLLATE NOCASE OR alt_title = ?1 COLLATE NOCASE
+    ORDER BY title
+"""
+
+# Top-K por descargas: el umbral sale del índice (downloads DESC, book_id) y
+# solo se ordenan por título las filas que lo alcanzan (empates incluidos).
+# CROSS JOIN fija book_stats como tabla externa para recorrer el índice.
+_SQL_FIND_POPULAR_TEMPLATE = """
+    SELECT {columns}
+    FROM book_stats bs
+    CROSS JOIN books b ON b.book_id = bs.book_id
+    WHERE bs.downloads >= COALESCE(
+        (SELECT downloads FROM book_stats ORDER BY downloads DESC LIMIT 1 OFFSET ?), 0
+    )
+    ORDER BY bs.downloads DESC, b.title
+    LIMIT ?
+"""
+
+_SQL_FIND_POPULAR = _SQL_FIND_POPULAR_TEMPLATE.format(columns=_BOOK_COLUMNS_SQL_B)
+
+# Con las descargas como última columna
+_SQL_FIND_POPULAR_WITH_DOWNLOADS = _SQL_FIND_POPULAR_TEMPLATE.format(
+    columns=f"{_BOOK_COLUMNS_SQL_B}, bs.downloads"
+)
+
+_SQL_UPDATE_FILE_ID_AND_SIZE = """
+    UPDATE books 
+    SET file_id = ?, file_size = ?, updated_at = CURRENT_TIMESTAMP 
+    WHERE book_id = ?
+"""
+
+_SQL_UPDATE_FILE_ID = """
+    UPDATE books 
+    SET file_id = ?, updated_at = CURRENT_TIMESTAMP 
+    WHERE book_id = ?
+"""
+
+_SQL_DELETE_BOOK = "DELETE FROM books WHERE book_id = ?"
+
+_SQL_EXISTS_BY_BOOK_ID = "SELECT EXISTS(SELECT 1 FROM books WHERE book_id = ?)"
+
+_SQL_EXISTS_BY_TITLE = "SELECT EXISTS(SELECT 1 FROM books WHERE title = ? COLLATE NOCASE)"
+
+_SQL_COUNT_BOOKS = "SELECT COUNT(*) as count FROM books"
+
+_SQL_HAS_STAT1 = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+
+_SQL_BOOKS_STAT1 = "SELECT stat FROM sqlite_stat1 WHERE tbl = 'books' LIMIT 1"
+
+_SQL_CATALOG = """
+    SELECT b.book_id, b.title 
+    FROM books b
+    LEFT JOIN book_stats bs ON b.book_id = bs.book_id
+    WHERE b.book_id IS NOT NULL 
+    ORDER BY COALESCE(bs.downloads, 0) DESC, b.title
+"""
+
+# Agregados de /about en una sola sentencia: uso de book_stats, total de libros,
+# tamaño de la BD y conteo por idioma (como JSON [[idioma, n], ...])
+_SQL_LIBRARY_STATS = """
+    SELECT (SELECT COUNT(*) FROM books),
+           SUM(downloads),
+           SUM(searches),
+           AVG(downloads),
+           MAX(downloads),
+           COUNT(CASE WHEN downloads > 0 THEN 1 END),
+           COUNT(last_accessed),
+           (SELECT page_count * page_size FROM pragma_page_count, pragma_page_size),
+           (SELECT json_group_array(json_array(language, n))
+            FROM (SELECT language, COUNT(*) AS n FROM books GROUP BY language))
+    FROM book_stats
+"""
+
+_SQL_BOOK_STATS = """
+    SELECT id, book_id, downloads, searches, last_accessed, created_at
+    FROM book_stats 
+    WHERE book_id = ?
+"""
+
+_SQL_TOUCH_LAST_ACCESSED = """
+    INSERT INTO book_stats (book_id, downloads, searches, last_accessed)
+    VALUES (?, 0, 0, CURRENT_TIMESTAMP)
+    ON CONFLICT(book_id) DO UPDATE SET last_accessed = CURRENT_TIMESTAMP
+"""
+
+# Volcado agregado de contadores: ignora libros inexistentes para no abortar el lote
+_STATS_FLUSH_SQL = """
+    INSERT INTO book_stats (book_id, downloads, searches, last_accessed)
+    SELECT ?1, ?2, ?3, CASE WHEN ?2 > 0 THEN CURRENT_TIMESTAMP END
+    WHERE EXISTS (SELECT 1 FROM books WHERE book_id = ?1)
+    ON CONFLICT(book_id) DO UPDATE SET
+        downloads = downloads + excluded.downloads,
+        searches = searches + excluded.searches,
+        last_accessed = COALESCE(excluded.last_accessed, last_accessed)
+"""
+
+
+def _like_prefix(term: str) -> str:
+    """Escapa comodines de LIKE y convierte el término en un patrón de prefijo."""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def _build_fts_query(term: str, columns: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """
+    Convierte texto libre del usuario en una consulta FTS5 segura.
+
+    Cada palabra se cita (escapando comillas) y se busca como prefijo; todas
+    deben aparecer. Con `columns` la búsqueda se limita a esas columnas.
+    """
+    tokens = [f'"{token.replace(chr(34), chr(34) * 2)}"*' for token in term.split()]
+    if not tokens:
+        return None
+
+    match_query = " ".join(tokens)
+    if columns:
+        match_query = f"{{{' '.join(columns)}}} : ({match_query})"
+
+    return match_query
+
+
+# Límites de BD resueltos una sola vez: (máximo, mensaje de error)
+_TITLE_LIMIT = (
+    DatabaseConstants.MAX_TITLE_LENGTH,
+    f"Título excede {DatabaseConstants.MAX_TITLE_LENGTH} caracteres"
+)
+_AUTHOR_LIMIT = (
+    DatabaseConstants.MAX_AUTHOR_LENGTH,
+    f"Autor excede {DatabaseConstants.MAX_AUTHOR_LENGTH} caracteres"
+)
+_DESCRIPTION_LIMIT = (
+    DatabaseConstants.MAX_DESCRIPTION_LENGTH,
+    f"Descripción excede {DatabaseConstants.MAX_DESCRIPTION_LENGTH} caracteres"
+)
+_MIN_BOOK_ID_LENGTH = DatabaseConstants.MIN_BOOK_ID_LENGTH
+_MAX_BOOK_ID_LENGTH = DatabaseConstants.MAX_BOOK_ID_LENGTH
+_BOOK_ID_LENGTH_ERROR = (
+    f"book_id debe tener entre {_MIN_BOOK_ID_LENGTH} y {_MAX_BOOK_ID_LENGTH} caracteres"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _check_book_limits(
+    title_length: int, author_length: int, description_length: int, book_id_length: int
+) -> None:
+    """Valida longitudes contra los límites de BD; cacheado por combinación de longitudes."""
+    for length, (maximum, message) in (
+        (title_length, _TITLE_LIMIT),
+        (author_length, _AUTHOR_LIMIT),
+        (description_length, _DESCRIPTION_LIMIT),
+    ):
+        if length > maximum:
+            raise ValueError(message)
+
+    if not _MIN_BOOK_ID_LENGTH <= book_id_length <= _MAX_BOOK_ID_LENGTH:
+        raise ValueError(_BOOK_ID_LENGTH_ERROR)
+
+
+# Marcador de fallo de caché (None es un resultado cacheable: libro inexistente)
+_MISSING = object()
+
+# Orden de campos de las tuplas legacy que consume BookService
+_LEGACY_GETTER = operator.attrgetter(
+    'id', 'book_id', 'title', 'alt_title', 'author', 'description', 'language', 'type',
+    'file_id', 'cover_id', 'isbn', 'publisher', 'year', 'file_size'
+)
+
+
+@dataclass(slots=True)
 class Book:
     """Modelo de datos para un libro."""
     book_id: str
@@ -35,51 +305,44 @@ class Book:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el libro a diccionario."""
-        return asdict(self)
-
-    def to_legacy_tuple(self) -> Tuple:
+        return {
+            'book_id': self.book_id,
+            'title': self.title,
+            'author': self.author,
+            'description': self.description,
+            'alt_title': self.alt_title,
+            'language': self.language,
+            'type': self.type,
+            'isbn': self.isbn,
+            'publisher': self.publisher,
+            'year': self.year,
+            'file_id': self.file_id,
+            'cover_id': self.cover_id,
+            'file_size': self.file_size,
+            'id': self.id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+    def to_legacy_tuple(self) -> Tuple[Any, ...]:
         """Convierte a tupla para compatibilidad con BookService."""
-        return (
-            self.id,
-            self.book_id,
-            self.title,
-            self.alt_title,
-            self.author,
-            self.description,
-            self.language,
-            self.type,
-            self.file_id,
-            self.cover_id,
-            self.isbn,
-            self.publisher,
-            self.year,
-            self.file_size
-        )
+        return _LEGACY_GETTER(self)
 
     @classmethod
-    def from_row(cls, row) -> 'Book':
-        """Crea instancia de Book desde fila de base de datos."""
+    def _make(cls, row: Sequence[Any]) -> 'Book':
+        """Crea Book desde una fila posicional en el orden de _BOOK_COLUMNS."""
+        (id_, book_id, title, alt_title, author, description, language, type_,
+         isbn, publisher, year, file_id, cover_id, file_size, created_at, updated_at) = row
+
+        # Argumentos posicionales en el orden de declaración de los campos
         return cls(
-            id=row['id'],
-            book_id=row['book_id'],
-            title=row['title'],
-            alt_title=row['alt_title'],
-            author=row['author'],
-            description=row['description'] or "",
-            language=row['language'] or "es",
-            type=row['type'] or "book",
-            isbn=row['isbn'],
-            publisher=row['publisher'],
-            year=row['year'],
-            file_id=row['file_id'],
-            cover_id=row['cover_id'],
-            file_size=row['file_size'],
-            created_at=row['created_at'],
-            updated_at=row['updated_at']
+            book_id, title, author, description, alt_title, language, type_,
+            isbn, publisher, year, file_id, cover_id, file_size,
+            id_, created_at, updated_at
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class BookStats:
     """Modelo para estadísticas de libros."""
     book_id: str
@@ -90,7 +353,7 @@ class BookStats:
     created_at: Optional[datetime] = None
 
     @classmethod
-    def from_row(cls, row) -> 'BookStats':
+    def from_row(cls, row: sqlite3.Row) -> 'BookStats':
         """Crea instancia desde fila de base de datos."""
         return cls(
             id=row['id'],
@@ -105,6 +368,35 @@ class BookStats:
 class BookRepository:
     """Repository para operaciones CRUD de libros."""
 
+    # Conteo de libros compartido entre instancias (todas usan la misma BD);
+    # generación y escrituras en curso permiten descartar conteos en vuelo
+    _count_cache: Optional[int] = None
+    _count_generation = 0
+    _count_writers = 0
+
+    # Cachés de lectura por book_id compartidas entre instancias
+    _book_cache: TTLCache = TTLCache(
+        maxsize=DatabaseConstants.READ_CACHE_SIZE, ttl=DatabaseConstants.READ_CACHE_TTL
+    )
+    _stats_cache: TTLCache = TTLCache(
+        maxsize=DatabaseConstants.READ_CACHE_SIZE, ttl=DatabaseConstants.READ_CACHE_TTL
+    )
+    _cache_lock = threading.Lock()
+
+    # Catálogo materializado: (book_ids ordenados, (book_id, title) por popularidad)
+    _catalog_cache: Optional[Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]] = None
+    _catalog_expires_at = 0.0
+
+    # Contadores pendientes de volcar a book_stats (write-behind): un único
+    # buffer y un único hilo de volcado por proceso, compartidos entre instancias
+    _pending_downloads: Counter = Counter()
+    _pending_searches: Counter = Counter()
+    _pending_total = 0
+    _pending_lock = threading.Lock()
+    _flush_requested = threading.Event()
+    _flush_urgent = threading.Event()
+    _flush_thread: Optional[threading.Thread] = None
+
     def __init__(self):
         """Inicializa el repository."""
         self.db = get_database()
@@ -112,58 +404,80 @@ class BookRepository:
 
     def create(self, book: Book) -> Optional[Book]:
         """Crea un nuevo libro en la base de datos."""
+        inserted = 0
+        self._begin_count_change()
         try:
             # Validar límites antes de insertar
             self._validate_book_limits(book)
 
-            command = """
-                INSERT INTO books (book_id, title, alt_title, author, description, 
-                                 language, type, isbn, publisher, year, file_id, cover_id, file_size)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                book.book_id,
-                book.title,
-                book.alt_title,
-                book.author,
-                book.description,
-                book.language,
-                book.type,
-                book.isbn,
-                book.publisher,
-                book.year,
-                book.file_id,
-                book.cover_id,
-                book.file_size
-            )
+            params = _INSERT_PARAMS_GETTER(book)
 
-            rows_affected = self.db.execute_command(command, params)
+            if _SUPPORTS_RETURNING:
+                rows = self.db.execute_returning(_SQL_INSERT_BOOK_RETURNING, params)
+                inserted = len(rows)
+                created = Book._make(rows[0]) if rows else None
+            else:
+                inserted = self.db.execute_command(_SQL_INSERT_BOOK, params)
+                created = _MISSING if inserted > 0 else None
+
+            if created is None:
+                return None
 
-            if rows_affected > 0:
-                # Obtener el libro creado con su ID generado
+            self._invalidate_cache(book.book_id)
+            self._invalidate_catalog()
+
+            if created is _MISSING:
+                # Sin RETURNING: obtener el libro creado con su ID generado
                 return self.find_by_book_id(book.book_id)
 
-            return None
+            return created
 
         except Exception as e:
             log_service_error("BookRepository", e, {"book_id": book.book_id})
             self.logger.error(f"Error creando libro {book.book_id}: {e}")
             return None
 
+        finally:
+            self._end_count_change(inserted)
+
+    def create_many(self, books: List[Book]) -> int:
+        """Crea varios libros con un único executemany en una transacción."""
+        if not books:
+            return 0
+
+        rows_affected = 0
+        self._begin_count_change()
+        try:
+            # Validar todo el lote antes de escribir nada
+            for book in books:
+                self._validate_book_limits(book)
+
+            rows_affected = self.db.execute_many(
+                _SQL_INSERT_BOOK, list(map(_INSERT_PARAMS_GETTER, books))
+            )
+
+            for book in books:
+                self._invalidate_cache(book.book_id)
+            self._invalidate_catalog()
+
+            self.logger.info(f"Libros creados en lote: {rows_affected}")
+            return rows_affected
+
+        except Exception as e:
+            log_service_error("BookRepository", e, {"batch_size": len(books)})
+            self.logger.error(f"Error creando lote de {len(books)} libros: {e}")
+            return 0
+
+        finally:
+            self._end_count_change(rows_affected)
+
     def find_by_id(self, id: int) -> Optional[Book]:
         """Busca libro por ID de base de datos."""
         try:
-            query = """
-                SELECT id, book_id, title, alt_title, author, description, 
-                       language, type, isbn, publisher, year, file_id, cover_id, 
-                       file_size, created_at, updated_at
-                FROM books 
-                WHERE id = ?
-            """
-            results = self.db.execute_query(query, (id,))
+            results = self.db.execute_read(_SQL_FIND_BY_ID, (id,))
 
             if results:
-                return Book.from_row(results[0])
+                return Book._make(results[0])
 
             return None
 
@@ -174,20 +488,19 @@ class BookRepository:
 
     def find_by_book_id(self, book_id: str) -> Optional[Book]:
         """Busca libro por book_id único."""
+        with self._cache_lock:
+            cached = self._book_cache.get(book_id, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
         try:
-            query = """
-                SELECT id, book_id, title, alt_title, author, description, 
-                       language, type, isbn, publisher, year, file_id, cover_id, 
-                       file_size, created_at, updated_at
-                FROM books 
-                WHERE book_id = ?
-            """
-            results = self.db.execute_query(query, (book_id,))
+            results = self.db.execute_read(_SQL_FIND_BY_BOOK_ID, (book_id,))
+            book = Book._make(results[0]) if results else None
 
-            if results:
-                return Book.from_row(results[0])
+            with self._cache_lock:
+                self._book_cache[book_id] = book
 
-            return None
+            return book
 
         except Exception as e:
             log_service_error("BookRepository", e, {"book_id": book_id})
@@ -196,50 +509,52 @@ class BookRepository:
 
     def find_all(self, limit: Optional[int] = None, offset: int = 0) -> List[Book]:
         """Obtiene todos los libros con paginación opcional."""
+        return list(self.iter_all(limit, offset))
+
+    def find_page(self, offset: int, limit: int) -> Tuple[List[Book], int]:
+        """Obtiene una página de libros por título junto con el total del catálogo."""
+        return self.find_all(limit, offset), self.count()
+
+    def iter_all(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        chunk_size: int = DatabaseConstants.FETCH_CHUNK_SIZE
+    ) -> Iterator[Book]:
+        """Recorre los libros por bloques sin materializar el catálogo completo."""
         try:
-            query = """
-                SELECT id, book_id, title, alt_title, author, description, 
-                       language, type, isbn, publisher, year, file_id, cover_id, 
-                       file_size, created_at, updated_at
-                FROM books 
-                ORDER BY title
-            """
-
-            if limit:
-                query += f" LIMIT {limit} OFFSET {offset}"
-
-            results = self.db.execute_query(query)
-            return [Book.from_row(row) for row in results]
+            rows = self.db.iter_query(
+                _SQL_FIND_ALL_PAGED, (limit or -1, offset), chunk_size, raw=True
+            )
+            yield from map(Book._make, rows)
 
         except Exception as e:
             log_service_error("BookRepository", e, {"limit": limit, "offset": offset})
             self.logger.error(f"Error obteniendo todos los libros: {e}")
-            return []
 
     def search(self, search_term: str) -> List[Book]:
-        """Búsqueda general en título, autor y descripción con relevancia."""
+        """
+        Búsqueda general en título, autor y descripción con relevancia (FTS5 + BM25).
+
+        Si FTS falla o no encuentra nada se recurre a una búsqueda por prefijo
+        en título, título alternativo y autor.
+        """
         try:
-            query = """
-                SELECT id, book_id, title, alt_title, author, description, 
-                       language, type, isbn, publisher, year, file_id, cover_id, 
-                       file_size, created_at, updated_at
-                FROM books 
-                WHERE title LIKE ? OR alt_title LIKE ? OR author LIKE ? OR description LIKE ?
-                ORDER BY 
-                    CASE 
-                        WHEN title LIKE ? THEN 1
-                        WHEN alt_title LIKE ? THEN 2
-                        WHEN author LIKE ? THEN 3
-                        ELSE 4
-                    END,
-                    title
-            """
-            search_pattern = f"%{search_term}%"
-            params = (search_pattern, search_pattern, search_pattern, search_pattern,
-                     search_pattern, search_pattern, search_pattern)
-
-            results = self.db.execute_query(query, params)
-            return [Book.from_row(row) for row in results]
+            term = search_term.strip()
+            match_query = _build_fts_query(term)
+            if not match_query:
+                return []
+
+            results = []
+            try:
+                results = self.db.execute_read(_SQL_SEARCH, (match_query,))
+            except Exception as e:
+                self.logger.warning(f"Búsqueda FTS fallida para '{search_term}', usando prefijos: {e}")
+
+            if not results:
+                results = self.db.execute_read(_SQL_SEARCH_PREFIX, (_like_prefix(term),))
+
+            return list(map(Book._make, results))
 
         except Exception as e:
             log_service_error("BookRepository", e, {"search_term": search_term})
@@ -250,29 +565,18 @@ class BookRepository:
         """Busca libros por título."""
         try:
             if exact_match:
-                query = """
-                    SELECT id, book_id, title, alt_title, author, description, 
-                           language, type, isbn, publisher, year, file_id, cover_id, 
-                           file_size, created_at, updated_at
-                    FROM books 
-                    WHERE LOWER(title) = ? OR LOWER(alt_title) = ?
-                    ORDER BY title
-                """
-                params = (title.lower(), title.lower())
+                query = _SQL_FIND_BY_TITLE_EXACT
+                params = (title,)
             else:
-                query = """
-                    SELECT id, book_id, title, alt_title, author, description, 
-                           language, type, isbn, publisher, year, file_id, cover_id, 
-                           file_size, created_at, updated_at
-                    FROM books 
-                    WHERE title LIKE ? OR alt_title LIKE ?
-                    ORDER BY title
-                """
-                search_term = f"%{title}%"
-                params = (search_term, search_term)
-
-            results = self.db.execute_query(query, params)
-            return [Book.from_row(row) for row in results]
+                match_query = _build_fts_query(title, ('title', 'alt_title'))
+                if not match_query:
+                    return []
+
+                query = _SQL_FTS_MATCH_ORDER_BY_TITLE
+                params = (match_query,)
+
+            results = self.db.execute_read(query, params)
+            return list(map(Book._make, results))
 
         except Exception as e:
             log_service_error("BookRepository", e, {"title": title, "exact_match": exact_match})
@@ -282,18 +586,13 @@ class BookRepository:
     def find_by_author(self, author: str) -> List[Book]:
         """Busca libros por autor."""
         try:
-            query = """
-                SELECT id, book_id, title, alt_title, author, description, 
-                       language, type, isbn, publisher, year, file_id, cover_id, 
-                       file_size, created_at, updated_at
-                FROM books 
-                WHERE author LIKE ?
-                ORDER BY title
-            """
-            search_term = f"%{author}%"
-            results = self.db.execute_query(query, (search_term,))
-
-            return [Book.from_row(row) for row in results]
+            match_query = _build_fts_query(author, ('author',))
+            if not match_query:
+                return []
+
+            results = self.db.execute_read(_SQL_FTS_MATCH_ORDER_BY_TITLE, (match_query,))
+
+            return list(map(Book._make, results))
 
         except Exception as e:
             log_service_error("BookRepository", e, {"author": author})
@@ -303,18 +602,23 @@ class BookRepository:
     def find_popular(self, limit: int = 10) -> List[Book]:
         """Encuentra libros más populares por descargas."""
         try:
-            query = """
-                SELECT b.id, b.book_id, b.title, b.alt_title, b.author, b.description, 
-                       b.language, b.type, b.isbn, b.publisher, b.year, b.file_id, 
-                       b.cover_id, b.file_size, b.created_at, b.updated_at
-                FROM books b
-                LEFT JOIN book_stats bs ON b.book_id = bs.book_id
-                ORDER BY COALESCE(bs.downloads, 0) DESC, b.title
-                LIMIT ?
-            """
-            results = self.db.execute_query(query, (limit,))
-
-            return [Book.from_row(row) for row in results]
+            results = self.db.execute_read(_SQL_FIND_POPULAR, (max(limit - 1, 0), limit))
+
+            return list(map(Book._make, results))
+
+        except Exception as e:
+            log_service_error("BookRepository", e, {"limit": limit})
+            self.logger.error(f"Error obteniendo libros populares: {e}")
+            return []
+
+    def find_popular_with_downloads(self, limit: int = 10) -> List[Tuple[Book, int]]:
+        """Encuentra libros más populares junto con su número de descargas."""
+        try:
+            results = self.db.execute_read(
+                _SQL_FIND_POPULAR_WITH_DOWNLOADS, (max(limit - 1, 0), limit)
+            )
+
+            return [(Book._make(row[:-1]), row[-1]) for row in results]
 
         except Exception as e:
             log_service_error("BookRepository", e, {"limit": limit})
@@ -327,31 +631,10 @@ class BookRepository:
             # Validar límites antes de actualizar
             self._validate_book_limits(book)
 
-            command = """
-                UPDATE books 
-                SET title = ?, alt_title = ?, author = ?, description = ?, 
-                    language = ?, type = ?, isbn = ?, publisher = ?, year = ?,
-                    file_id = ?, cover_id = ?, file_size = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE book_id = ?
-            """
-            params = (
-                book.title,
-                book.alt_title,
-                book.author,
-                book.description,
-                book.language,
-                book.type,
-                book.isbn,
-                book.publisher,
-                book.year,
-                book.file_id,
-                book.cover_id,
-                book.file_size,
-                book.book_id
-            )
-
-            rows_affected = self.db.execute_command(command, params)
+            rows_affected = self.db.execute_command(_SQL_UPDATE_BOOK, _UPDATE_PARAMS_GETTER(book))
             success = rows_affected > 0
+            self._invalidate_cache(book.book_id)
+            self._invalidate_catalog()
 
             if success:
                 self.logger.info(f"Libro actualizado: {book.book_id}")
@@ -369,22 +652,15 @@ class BookRepository:
         """Actualiza file_id y opcionalmente file_size de un libro."""
         try:
             if file_size:
-                command = """
-                    UPDATE books 
-                    SET file_id = ?, file_size = ?, updated_at = CURRENT_TIMESTAMP 
-                    WHERE book_id = ?
-                """
+                command = _SQL_UPDATE_FILE_ID_AND_SIZE
                 params = (file_id, file_size, book_id)
             else:
-                command = """
-                    UPDATE books 
-                    SET file_id = ?, updated_at = CURRENT_TIMESTAMP 
-                    WHERE book_id = ?
-                """
+                command = _SQL_UPDATE_FILE_ID
                 params = (file_id, book_id)
 
             rows_affected = self.db.execute_command(command, params)
             success = rows_affected > 0
+            self._invalidate_cache(book_id)
 
             if success:
                 self.logger.info(f"File ID actualizado para libro: {book_id}")
@@ -398,10 +674,13 @@ class BookRepository:
 
     def delete(self, book_id: str) -> bool:
         """Elimina un libro por book_id."""
+        rows_affected = 0
+        self._begin_count_change()
         try:
-            command = "DELETE FROM books WHERE book_id = ?"
-            rows_affected = self.db.execute_command(command, (book_id,))
+            rows_affected = self.db.execute_command(_SQL_DELETE_BOOK, (book_id,))
             success = rows_affected > 0
+            self._invalidate_cache(book_id)
+            self._invalidate_catalog()
 
             if success:
                 self.logger.info(f"Libro eliminado: {book_id}")
@@ -415,12 +694,18 @@ class BookRepository:
             self.logger.error(f"Error eliminando libro {book_id}: {e}")
             return False
 
+        finally:
+            self._end_count_change(-rows_affected)
+
     def exists(self, book_id: str) -> bool:
         """Verifica si existe un libro con el book_id dado."""
+        with self._cache_lock:
+            cached = self._book_cache.get(book_id, _MISSING)
+        if cached is not _MISSING:
+            return cached is not None
+
         try:
-            query = "SELECT 1 FROM books WHERE book_id = ? LIMIT 1"
-            results = self.db.execute_query(query, (book_id,))
-            return len(results) > 0
+            return bool(self.db.execute_scalar(_SQL_EXISTS_BY_BOOK_ID, (book_id,)))
 
         except Exception as e:
             log_service_error("BookRepository", e, {"book_id": book_id})
@@ -430,9 +715,7 @@ class BookRepository:
     def exists_by_title(self, title: str) -> bool:
         """Verifica si existe un libro con el título dado."""
         try:
-            query = "SELECT 1 FROM books WHERE LOWER(title) = ? LIMIT 1"
-            results = self.db.execute_query(query, (title.lower(),))
-            return len(results) > 0
+            return bool(self.db.execute_scalar(_SQL_EXISTS_BY_TITLE, (title,)))
 
         except Exception as e:
             log_service_error("BookRepository", e, {"title": title})
@@ -440,69 +723,153 @@ class BookRepository:
             return False
 
     def count(self) -> int:
-        """Retorna el número total de libros."""
+        """Retorna el número total de libros (cacheado hasta create/delete)."""
+        with self._cache_lock:
+            cached = BookRepository._count_cache
+            generation = BookRepository._count_generation
+        if cached is not None:
+            return cached
+
         try:
-            query = "SELECT COUNT(*) as count FROM books"
-            results = self.db.execute_query(query)
+            results = self.db.execute_query(_SQL_COUNT_BOOKS)
 
-            if results:
-                return results[0]['count']
-
-            return 0
+            total = results[0]['count'] if results else 0
+            with self._cache_lock:
+                # Un create/delete durante la consulta deja el conteo sin cachear
+                if (BookRepository._count_generation == generation
+                        and BookRepository._count_writers == 0):
+                    BookRepository._count_cache = total
+            return total
 
         except Exception as e:
             log_service_error("BookRepository", e)
             self.logger.error(f"Error contando libros: {e}")
             return 0
 
-    def get_all_book_ids(self) -> List[str]:
-        """Obtiene todos los book_ids para comandos dinámicos."""
+    def count_estimate(self) -> int:
+        """Retorna un conteo aproximado desde sqlite_stat1 sin recorrer la tabla."""
         try:
-            query = "SELECT book_id FROM books WHERE book_id IS NOT NULL ORDER BY book_id"
-            results = self.db.execute_query(query)
+            # sqlite_stat1 solo existe tras ANALYZE
+            if self.db.execute_query(_SQL_HAS_STAT1):
+                results = self.db.execute_query(_SQL_BOOKS_STAT1)
 
-            return [row['book_id'] for row in results]
+                if results and results[0]['stat']:
+                    return int(results[0]['stat'].split()[0])
 
         except Exception as e:
             log_service_error("BookRepository", e)
-            self.logger.error(f"Error obteniendo book_ids: {e}")
-            return []
+            self.logger.warning(f"Error leyendo sqlite_stat1: {e}")
+
+        return self.count()
+
+    @classmethod
+    def _begin_count_change(cls) -> None:
+        """Marca una escritura en curso que puede alterar el conteo de libros."""
+        with cls._cache_lock:
+            cls._count_generation += 1
+            cls._count_writers += 1
+
+    @classmethod
+    def _end_count_change(cls, delta: int) -> None:
+        """Cierra la escritura y ajusta el conteo cacheado con las filas afectadas."""
+        with cls._cache_lock:
+            cls._count_generation += 1
+            cls._count_writers -= 1
+            if cls._count_cache is not None:
+                cls._count_cache += delta
+
+    @classmethod
+    def _invalidate_cache(cls, book_id: str) -> None:
+        """Descarta las entradas cacheadas de un libro tras escribirlo."""
+        with cls._cache_lock:
+            cls._book_cache.pop(book_id, None)
+            cls._stats_cache.pop(book_id, None)
+
+    def get_all_book_ids(self) -> List[str]:
+        """Obtiene todos los book_ids para comandos dinámicos."""
+        catalog = self._get_catalog()
+        return list(catalog[0]) if catalog else []
 
     def get_books_for_recommendations(self) -> List[Tuple[str, str]]:
         """Obtiene lista simplificada (book_id, title) para recomendaciones."""
-        try:
-            query = """
-                SELECT b.book_id, b.title 
-                FROM books b
-                LEFT JOIN book_stats bs ON b.book_id = bs.book_id
-                WHERE b.book_id IS NOT NULL 
-                ORDER BY COALESCE(bs.downloads, 0) DESC, b.title
-            """
-            results = self.db.execute_query(query)
+        catalog = self._get_catalog()
+        return list(catalog[1]) if catalog else []
 
-            return [(row['book_id'], row['title']) for row in results]
+    def _get_catalog(self) -> Optional[Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]]:
+        """Materializa ids y recomendaciones con una sola consulta cacheada."""
+        catalog = BookRepository._catalog_cache
+        if catalog is not None and time.monotonic() < BookRepository._catalog_expires_at:
+            return catalog
+
+        try:
+            # Filas raw: ya son tuplas (book_id, title)
+            recommendations = tuple(self.db.execute_read(_SQL_CATALOG))
+            book_ids = tuple(sorted(book_id for book_id, _ in recommendations))
+            catalog = (book_ids, recommendations)
+
+            BookRepository._catalog_cache = catalog
+            BookRepository._catalog_expires_at = (
+                time.monotonic() + DatabaseConstants.CATALOG_CACHE_TTL
+            )
+            return catalog
 
         except Exception as e:
             log_service_error("BookRepository", e)
-            self.logger.error(f"Error obteniendo libros para recomendaciones: {e}")
-            return []
+            self.logger.error(f"Error obteniendo catálogo de libros: {e}")
+            return None
+
+    @classmethod
+    def _invalidate_catalog(cls) -> None:
+        """Descarta el catálogo materializado tras altas, cambios o bajas."""
+        cls._catalog_cache = None
 
     # OPERACIONES CON ESTADÍSTICAS
 
+    def get_library_stats(self) -> Dict[str, Any]:
+        """Obtiene los agregados de la biblioteca en una sola consulta."""
+        try:
+            row = self.db.execute_read(_SQL_LIBRARY_STATS)[0]
+            (total_books, total_downloads, total_searches, avg_downloads, max_downloads,
+             downloaded_books, accessed_books, db_size_bytes, languages_json) = row
+
+            languages = sorted(
+                (tuple(pair) for pair in json.loads(languages_json or "[]")),
+                key=operator.itemgetter(1),
+                reverse=True
+            )
+
+            return {
+                'total_books': total_books,
+                'db_size_mb': round((db_size_bytes or 0) / (1024 * 1024), 2),
+                'total_downloads': total_downloads or 0,
+                'total_searches': total_searches or 0,
+                'avg_downloads': round(avg_downloads or 0, 1),
+                'max_downloads': max_downloads or 0,
+                'downloaded_books': downloaded_books or 0,
+                'accessed_books': accessed_books or 0,
+                'languages': languages
+            }
+
+        except Exception as e:
+            log_service_error("BookRepository", e)
+            self.logger.error(f"Error obteniendo estadísticas de la biblioteca: {e}")
+            return {}
+
     def get_book_stats(self, book_id: str) -> Optional[BookStats]:
         """Obtiene estadísticas de un libro."""
+        with self._cache_lock:
+            cached = self._stats_cache.get(book_id, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
         try:
-            query = """
-                SELECT id, book_id, downloads, searches, last_accessed, created_at
-                FROM book_stats 
-                WHERE book_id = ?
-            """
-            results = self.db.execute_query(query, (book_id,))
+            results = self.db.execute_query(_SQL_BOOK_STATS, (book_id,))
+            stats = BookStats.from_row(results[0]) if results else None
 
-            if results:
-                return BookStats.from_row(results[0])
+            with self._cache_lock:
+                self._stats_cache[book_id] = stats
 
-            return None
+            return stats
 
         except Exception as e:
             log_service_error("BookRepository", e, {"book_id": book_id})
@@ -510,63 +877,98 @@ class BookRepository:
             return None
 
     def increment_downloads(self, book_id: str) -> bool:
-        """Incrementa contador de descargas."""
-        try:
-            command = """
-                UPDATE book_stats 
-                SET downloads = downloads + 1, last_accessed = CURRENT_TIMESTAMP 
-                WHERE book_id = ?
-            """
-            rows_affected = self.db.execute_command(command, (book_id,))
-
-            if rows_affected == 0:
-                # Crear registro si no existe
-                self._ensure_stats_record(book_id)
-                rows_affected = self.db.execute_command(command, (book_id,))
+        """Registra una descarga; se persiste en el siguiente flush."""
+        return self._buffer_increment(self._pending_downloads, (book_id,))
 
-            return rows_affected > 0
+    def increment_searches(self, book_id: str) -> bool:
+        """Registra una búsqueda; se persiste en el siguiente flush."""
+        return self._buffer_increment(self._pending_searches, (book_id,))
 
-        except Exception as e:
-            log_service_error("BookRepository", e, {"book_id": book_id})
-            self.logger.error(f"Error incrementando descargas: {e}")
-            return False
+    def increment_searches_bulk(self, book_ids: Iterable[str]) -> bool:
+        """Registra una búsqueda para cada libro con un único acceso al buffer."""
+        book_ids = tuple(book_ids)
+        if not book_ids:
+            return True
+        return self._buffer_increment(self._pending_searches, book_ids)
+
+    @classmethod
+    def flush(cls) -> int:
+        """Vuelca los contadores pendientes en una sola transacción."""
+        # Copiar y vaciar en sitio: los Counter conservan su identidad
+        with cls._pending_lock:
+            downloads = cls._pending_downloads.copy()
+            searches = cls._pending_searches.copy()
+            cls._pending_downloads.clear()
+            cls._pending_searches.clear()
+            cls._pending_total = 0
+            cls._flush_requested.clear()
+            cls._flush_urgent.clear()
+
+        if not downloads and not searches:
+            return 0
+
+        book_ids = downloads.keys() | searches.keys()
+        params = [(book_id, downloads[book_id], searches[book_id]) for book_id in book_ids]
 
-    def increment_searches(self, book_id: str) -> bool:
-        """Incrementa contador de búsquedas."""
         try:
-            command = """
-                UPDATE book_stats 
-                SET searches = searches + 1 
-                WHERE book_id = ?
-            """
-            rows_affected = self.db.execute_command(command, (book_id,))
-
-            if rows_affected == 0:
-                # Crear registro si no existe
-                self._ensure_stats_record(book_id)
-                rows_affected = self.db.execute_command(command, (book_id,))
+            rows_affected = get_database().execute_many(_STATS_FLUSH_SQL, params)
 
-            return rows_affected > 0
+            with cls._cache_lock:
+                for book_id in book_ids:
+                    cls._stats_cache.pop(book_id, None)
+
+            return rows_affected
 
         except Exception as e:
-            log_service_error("BookRepository", e, {"book_id": book_id})
-            self.logger.error(f"Error incrementando búsquedas: {e}")
-            return False
+            logger = get_logger(__name__)
+            log_service_error("BookRepository", e, {"pending_books": len(params)})
+            logger.error(f"Error volcando estadísticas pendientes: {e}")
+
+            # Devolver los contadores al buffer para reintentarlos en el siguiente volcado
+            with cls._pending_lock:
+                cls._pending_downloads.update(downloads)
+                cls._pending_searches.update(searches)
+                cls._pending_total += sum(downloads.values()) + sum(searches.values())
+                cls._flush_requested.set()
+            return 0
+
+    @classmethod
+    def _buffer_increment(cls, pending: Counter, book_ids: Sequence[str]) -> bool:
+        """Acumula incrementos y programa su volcado."""
+        with cls._pending_lock:
+            pending.update(book_ids)
+            cls._pending_total += len(book_ids)
+            total = cls._pending_total
+
+            if cls._flush_thread is None:
+                cls._flush_thread = threading.Thread(
+                    target=cls._flush_loop, name="book-stats-flush", daemon=True
+                )
+                cls._flush_thread.start()
+
+        # Nunca se vuelca aquí: el llamador puede ser el event loop
+        cls._flush_requested.set()
+        if total >= DatabaseConstants.STATS_FLUSH_THRESHOLD:
+            cls._flush_urgent.set()
+
+        return True
+
+    @classmethod
+    def _flush_loop(cls) -> None:
+        """Hilo de fondo que agrupa los incrementos de cada intervalo."""
+        while True:
+            cls._flush_requested.wait()
+            # Al superar el umbral se despierta antes de que termine el intervalo
+            cls._flush_urgent.wait(DatabaseConstants.STATS_FLUSH_INTERVAL)
+            cls.flush()
 
     def update_last_accessed(self, book_id: str) -> bool:
         """Actualiza timestamp de último acceso."""
         try:
-            command = """
-                UPDATE book_stats 
-                SET last_accessed = CURRENT_TIMESTAMP 
-                WHERE book_id = ?
-            """
-            rows_affected = self.db.execute_command(command, (book_id,))
-
-            if rows_affected == 0:
-                # Crear registro si no existe
-                self._ensure_stats_record(book_id)
-                rows_affected = self.db.execute_command(command, (book_id,))
+            rows_affected = self.db.execute_command(_SQL_TOUCH_LAST_ACCESSED, (book_id,))
+
+            with self._cache_lock:
+                self._stats_cache.pop(book_id, None)
 
             return rows_affected > 0
 
@@ -575,29 +977,8 @@ class BookRepository:
             self.logger.error(f"Error actualizando último acceso: {e}")
             return False
 
-    def _ensure_stats_record(self, book_id: str) -> None:
-        """Asegura que existe un registro de estadísticas para el libro."""
-        try:
-            command = """
-                INSERT OR IGNORE INTO book_stats (book_id, downloads, searches) 
-                VALUES (?, 0, 0)
-            """
-            self.db.execute_command(command, (book_id,))
-
-        except Exception as e:
-            self.logger.warning(f"Error creando registro de estadísticas: {e}")
-
     def _validate_book_limits(self, book: Book) -> None:
         """Valida que el libro cumple con los límites de BD."""
-        if len(book.title) > DatabaseConstants.MAX_TITLE_LENGTH:
-            raise ValueError(f"Título excede {DatabaseConstants.MAX_TITLE_LENGTH} caracteres")
-
-        if len(book.author) > DatabaseConstants.MAX_AUTHOR_LENGTH:
-            raise ValueError(f"Autor excede {DatabaseConstants.MAX_AUTHOR_LENGTH} caracteres")
-
-        if book.description and len(book.description) > DatabaseConstants.MAX_DESCRIPTION_LENGTH:
-            raise ValueError(f"Descripción excede {DatabaseConstants.MAX_DESCRIPTION_LENGTH} caracteres")
-
-        if (len(book.book_id) < DatabaseConstants.MIN_BOOK_ID_LENGTH or
-            len(book.book_id) > DatabaseConstants.MAX_BOOK_ID_LENGTH):
-            raise ValueError(f"book_id debe tener entre {DatabaseConstants.MIN_BOOK_ID_LENGTH} y {DatabaseConstants.MAX_BOOK_ID_LENGTH} caracteres")
\ No newline at end of file
+        _check_book_limits(
+            len(book.title), len(book.author), len(book.description or ''), len(book.book_id)
+        )
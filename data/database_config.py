@@ -4,6 +4,7 @@ Maneja configuración, schemas y migraciones de la base de datos.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
@@ -31,6 +32,10 @@ class DatabaseConfig:
     cache_size_mb: int
     backup_enabled: bool
     backup_interval_hours: int
+    # WAL2 (rama experimental de SQLite): dos archivos de WAL alternos, los escritores
+    # no se bloquean mientras se hace checkpoint del otro. Si la compilación de SQLite
+    # no lo soporta se mantiene WAL
+    enable_wal2: bool = False
 
     @classmethod
     def create_sqlite_config(cls) -> 'DatabaseConfig':
@@ -46,7 +51,8 @@ class DatabaseConfig:
             enable_foreign_keys=True,
             cache_size_mb=64,
             backup_enabled=True,
-            backup_interval_hours=24
+            backup_interval_hours=24,
+            enable_wal2=config.db_enable_wal2
         )
 
 
@@ -54,6 +60,7 @@ class DatabaseSchema:
     """Define el schema de la base de datos."""
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_tables_definition() -> Dict[str, str]:
         """Retorna definiciones de todas las tablas."""
         return {
@@ -92,15 +99,15 @@ class DatabaseSchema:
                """
 
     @staticmethod
-    def _get_book_stats_table() -> str:
+    def _get_book_stats_table(table_name: str = "book_stats") -> str:
         """Tabla para estadísticas de libros."""
-        return """
-               CREATE TABLE IF NOT EXISTS book_stats \
+        return f"""
+               CREATE TABLE IF NOT EXISTS {table_name} \
                ( \
                    id            INTEGER PRIMARY KEY AUTOINCREMENT, \
                    book_id       TEXT NOT NULL, \
-                   downloads     INTEGER   DEFAULT 0, \
-                   searches      INTEGER   DEFAULT 0, \
+                   downloads     INTEGER NOT NULL DEFAULT 0, \
+                   searches      INTEGER NOT NULL DEFAULT 0, \
                    last_accessed TIMESTAMP, \
                    created_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP, \
 
@@ -126,67 +133,166 @@ class DatabaseSchema:
                """
 
     @staticmethod
-    def get_indexes_definition() -> List[str]:
-        """Retorna definiciones de índices para optimización."""
-        return [
-            # Índices principales para books
-            "CREATE INDEX IF NOT EXISTS idx_books_book_id ON books(book_id)",
-            "CREATE INDEX IF NOT EXISTS idx_books_title ON books(title)",
-            "CREATE INDEX IF NOT EXISTS idx_books_author ON books(author)",
-            "CREATE INDEX IF NOT EXISTS idx_books_language ON books(language)",
-            "CREATE INDEX IF NOT EXISTS idx_books_type ON books(type)",
-            "CREATE INDEX IF NOT EXISTS idx_books_created_at ON books(created_at)",
+    @lru_cache(maxsize=1)
+    def get_named_indexes() -> Dict[str, str]:
+        """Retorna definiciones de índices para optimización, por nombre."""
+        return {
+            # Índices principales para books (title y language los cubren los compuestos)
+            "idx_books_book_id":
+                "CREATE INDEX IF NOT EXISTS idx_books_book_id ON books(book_id)",
+            "idx_books_author":
+                "CREATE INDEX IF NOT EXISTS idx_books_author ON books(author)",
+            "idx_books_type":
+                "CREATE INDEX IF NOT EXISTS idx_books_type ON books(type)",
+            "idx_books_created_at":
+                "CREATE INDEX IF NOT EXISTS idx_books_created_at ON books(created_at)",
 
             # Índices para búsquedas compuestas
-            "CREATE INDEX IF NOT EXISTS idx_books_title_author ON books(title, author)",
-            "CREATE INDEX IF NOT EXISTS idx_books_language_type ON books(language, type)",
-
-            # Índices para book_stats
-            "CREATE INDEX IF NOT EXISTS idx_book_stats_book_id ON book_stats(book_id)",
-            "CREATE INDEX IF NOT EXISTS idx_book_stats_downloads ON book_stats(downloads DESC)",
-            "CREATE INDEX IF NOT EXISTS idx_book_stats_last_accessed ON book_stats(last_accessed DESC)",
+            "idx_books_title_author":
+                "CREATE INDEX IF NOT EXISTS idx_books_title_author ON books(title, author)",
+            "idx_books_language_type":
+                "CREATE INDEX IF NOT EXISTS idx_books_language_type ON books(language, type)",
+
+            # Índices para book_stats (book_id lo cubre idx_book_stats_book_id_unique)
+            # Índice cubriente para el top-K de find_popular
+            "idx_book_stats_downloads_book_id":
+                "CREATE INDEX IF NOT EXISTS idx_book_stats_downloads_book_id ON book_stats(downloads DESC, book_id)",
+            "idx_book_stats_last_accessed":
+                "CREATE INDEX IF NOT EXISTS idx_book_stats_last_accessed ON book_stats(last_accessed DESC)",
+
+            # Índice único requerido por los UPSERT de book_stats
+            "idx_book_stats_book_id_unique":
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_book_stats_book_id_unique ON book_stats(book_id)",
+
+            # Índices NOCASE: búsqueda exacta sin distinguir mayúsculas y por prefijo
+            # con LIKE (respaldo de FTS)
+            "idx_books_title_nocase":
+                "CREATE INDEX IF NOT EXISTS idx_books_title_nocase ON books(title COLLATE NOCASE)",
+            "idx_books_alt_title_nocase":
+                "CREATE INDEX IF NOT EXISTS idx_books_alt_title_nocase ON books(alt_title COLLATE NOCASE)",
+            "idx_books_author_nocase":
+                "CREATE INDEX IF NOT EXISTS idx_books_author_nocase ON books(author COLLATE NOCASE)",
 
             # Índices para user_preferences
-            "CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences(user_id)"
-        ]
+            "idx_user_preferences_user_id":
+                "CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences(user_id)"
+        }
 
     @staticmethod
-    def get_triggers_definition() -> List[str]:
-        """Retorna definiciones de triggers para automatización."""
-        return [
-            # Trigger para actualizar updated_at en books
-            """
+    @lru_cache(maxsize=1)
+    def get_named_triggers() -> Dict[str, str]:
+        """Retorna definiciones de triggers para automatización, por nombre."""
+        return {
+            # Trigger para actualizar updated_at en books; el WHEN lo omite cuando
+            # el UPDATE ya fijó la marca (los del repositorio la incluyen en su SET)
+            "trigger_books_updated_at": """
             CREATE TRIGGER IF NOT EXISTS trigger_books_updated_at
                 AFTER UPDATE
                 ON books
                 FOR EACH ROW
+                WHEN NEW.updated_at IS OLD.updated_at
             BEGIN
                 UPDATE books SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
             END
             """,
 
             # Trigger para actualizar updated_at en user_preferences
-            """
+            "trigger_user_preferences_updated_at": """
             CREATE TRIGGER IF NOT EXISTS trigger_user_preferences_updated_at
                 AFTER UPDATE
                 ON user_preferences
                 FOR EACH ROW
+                WHEN NEW.updated_at IS OLD.updated_at
             BEGIN
                 UPDATE user_preferences SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
             END
             """,
 
             # Trigger para crear stats automáticamente
-            """
+            "trigger_create_book_stats": """
             CREATE TRIGGER IF NOT EXISTS trigger_create_book_stats
                 AFTER INSERT
                 ON books
                 FOR EACH ROW
             BEGIN
-                INSERT INTO book_stats (book_id) VALUES (NEW.book_id);
+                INSERT OR IGNORE INTO book_stats (book_id) VALUES (NEW.book_id);
+            END
+            """,
+
+            # Triggers para mantener sincronizado el índice FTS5
+            "trigger_books_fts_insert": """
+            CREATE TRIGGER IF NOT EXISTS trigger_books_fts_insert
+                AFTER INSERT
+                ON books
+                FOR EACH ROW
+            BEGIN
+                INSERT INTO books_fts (rowid, title, alt_title, author, description)
+                VALUES (NEW.id, NEW.title, NEW.alt_title, NEW.author, NEW.description);
+            END
+            """,
+            "trigger_books_fts_delete": """
+            CREATE TRIGGER IF NOT EXISTS trigger_books_fts_delete
+                AFTER DELETE
+                ON books
+                FOR EACH ROW
+            BEGIN
+                INSERT INTO books_fts (books_fts, rowid, title, alt_title, author, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.alt_title, OLD.author, OLD.description);
+            END
+            """,
+            "trigger_books_fts_update": """
+            CREATE TRIGGER IF NOT EXISTS trigger_books_fts_update
+                AFTER UPDATE
+                ON books
+                FOR EACH ROW
+            BEGIN
+                INSERT INTO books_fts (books_fts, rowid, title, alt_title, author, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.alt_title, OLD.author, OLD.description);
+                INSERT INTO books_fts (rowid, title, alt_title, author, description)
+                VALUES (NEW.id, NEW.title, NEW.alt_title, NEW.author, NEW.description);
             END
             """
-        ]
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_indexes_definition() -> Tuple[str, ...]:
+        """Retorna definiciones de índices para optimización."""
+        return tuple(DatabaseSchema.get_named_indexes().values())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_triggers_definition() -> Tuple[str, ...]:
+        """Retorna definiciones de triggers para automatización."""
+        return tuple(DatabaseSchema.get_named_triggers().values())
+
+    @staticmethod
+    def get_indexes(*names: str) -> List[str]:
+        """Retorna las definiciones de los índices indicados por nombre."""
+        indexes = DatabaseSchema.get_named_indexes()
+        return [indexes[name] for name in names]
+
+    @staticmethod
+    def get_triggers(*names: str) -> List[str]:
+        """Retorna las definiciones de los triggers indicados por nombre."""
+        triggers = DatabaseSchema.get_named_triggers()
+        return [triggers[name] for name in names]
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_fts_table_definition() -> str:
+        """Tabla virtual FTS5 (contenido externo) sobre los campos de búsqueda de books."""
+        return """
+               CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5( \
+                   title, \
+                   alt_title, \
+                   author, \
+                   description, \
+                   content='books', \
+                   content_rowid='id', \
+                   tokenize='unicode61 remove_diacritics 2' \
+               ) \
+               """
 
 
 class DatabaseMigrator:
@@ -197,35 +303,157 @@ class DatabaseMigrator:
         self.logger = get_logger(__name__)
         self.current_version = 1
 
-    def get_migrations(self) -> Dict[int, List[str]]:
-        """Retorna todas las migraciones disponibles."""
-        return {
-            1: self._migration_v1_initial_schema(),
-            2: self._migration_v2_add_stats_table(),
-            3: self._migration_v3_add_user_preferences()
+        # Migraciones construidas una sola vez por instancia
+        self._migrations: Dict[int, Tuple[str, ...]] = {
+            version: tuple(build())
+            for version, build in (
+                (1, self._migration_v1_initial_schema),
+                (2, self._migration_v2_add_stats_table),
+                (3, self._migration_v3_add_user_preferences),
+                (4, self._migration_v4_add_full_text_search),
+                (5, self._migration_v5_unique_book_stats),
+                (6, self._migration_v6_popular_covering_index),
+                (7, self._migration_v7_not_null_counters),
+                (8, self._migration_v8_prefix_search_indexes),
+                (9, self._migration_v9_drop_redundant_indexes),
+                (10, self._migration_v10_updated_at_when_clause),
+                (11, self._migration_v11_drop_duplicate_stats_index),
+                (12, self._migration_v12_drop_lower_title_indexes)
+            )
         }
 
+    def get_migrations(self) -> Dict[int, Tuple[str, ...]]:
+        """Retorna todas las migraciones disponibles."""
+        return self._migrations
+
     def _migration_v1_initial_schema(self) -> List[str]:
         """Migración inicial - crear tabla books."""
         return [
             DatabaseSchema._get_books_table(),
-            *DatabaseSchema.get_indexes_definition()[:6]  # Solo índices básicos
+            *DatabaseSchema.get_indexes(  # Solo índices básicos
+                "idx_books_book_id", "idx_books_author", "idx_books_type",
+                "idx_books_created_at", "idx_books_title_author", "idx_books_language_type"
+            )
         ]
 
     def _migration_v2_add_stats_table(self) -> List[str]:
         """Migración v2 - agregar tabla de estadísticas."""
         return [
             DatabaseSchema._get_book_stats_table(),
-            *DatabaseSchema.get_indexes_definition()[6:9],  # Índices de stats
-            DatabaseSchema.get_triggers_definition()[2]  # Trigger para crear stats
+            *DatabaseSchema.get_indexes(  # Índices de stats
+                "idx_book_stats_downloads_book_id", "idx_book_stats_last_accessed"
+            ),
+            *DatabaseSchema.get_triggers("trigger_create_book_stats")  # Trigger para crear stats
         ]
 
     def _migration_v3_add_user_preferences(self) -> List[str]:
         """Migración v3 - agregar preferencias de usuario."""
         return [
             DatabaseSchema._get_user_preferences_table(),
-            DatabaseSchema.get_indexes_definition()[-1],  # Índice user_preferences
-            *DatabaseSchema.get_triggers_definition()[:2]  # Triggers updated_at
+            *DatabaseSchema.get_indexes("idx_user_preferences_user_id"),
+            *DatabaseSchema.get_triggers(  # Triggers updated_at
+                "trigger_books_updated_at", "trigger_user_preferences_updated_at"
+            )
+        ]
+
+    def _migration_v4_add_full_text_search(self) -> List[str]:
+        """Migración v4 - índice FTS5 para búsquedas."""
+        return [
+            DatabaseSchema.get_fts_table_definition(),
+            *DatabaseSchema.get_triggers(  # Triggers de sincronización FTS
+                "trigger_books_fts_insert", "trigger_books_fts_delete", "trigger_books_fts_update"
+            ),
+            "INSERT INTO books_fts (books_fts) VALUES ('rebuild')"
+        ]
+
+    def _migration_v5_unique_book_stats(self) -> List[str]:
+        """Migración v5 - book_stats único por libro para permitir UPSERT."""
+        return [
+            # Consolidar duplicados en el registro más antiguo antes del índice único
+            """
+            UPDATE book_stats
+            SET downloads = (SELECT SUM(COALESCE(s.downloads, 0)) FROM book_stats s
+                             WHERE s.book_id = book_stats.book_id),
+                searches = (SELECT SUM(COALESCE(s.searches, 0)) FROM book_stats s
+                            WHERE s.book_id = book_stats.book_id),
+                last_accessed = (SELECT MAX(s.last_accessed) FROM book_stats s
+                                 WHERE s.book_id = book_stats.book_id)
+            WHERE id IN (SELECT MIN(id) FROM book_stats GROUP BY book_id HAVING COUNT(*) > 1)
+            """,
+            """
+            DELETE FROM book_stats
+            WHERE id NOT IN (SELECT MIN(id) FROM book_stats GROUP BY book_id)
+            """,
+            *DatabaseSchema.get_indexes("idx_book_stats_book_id_unique"),
+            "DROP TRIGGER IF EXISTS trigger_create_book_stats",
+            *DatabaseSchema.get_triggers("trigger_create_book_stats")  # Con INSERT OR IGNORE
+        ]
+
+    def _migration_v6_popular_covering_index(self) -> List[str]:
+        """Migración v6 - índice cubriente (downloads DESC, book_id) para populares."""
+        return [
+            "DROP INDEX IF EXISTS idx_book_stats_downloads",
+            *DatabaseSchema.get_indexes("idx_book_stats_downloads_book_id")
+        ]
+
+    def _migration_v7_not_null_counters(self) -> List[str]:
+        """Migración v7 - downloads/searches NOT NULL para ordenar por índice sin COALESCE."""
+        # SQLite no permite alterar columnas: se reconstruye la tabla
+        return [
+            DatabaseSchema._get_book_stats_table("book_stats_new"),
+            """
+            INSERT INTO book_stats_new (id, book_id, downloads, searches, last_accessed, created_at)
+            SELECT id, book_id, COALESCE(downloads, 0), COALESCE(searches, 0),
+                   last_accessed, created_at
+            FROM book_stats
+            """,
+            # El trigger de books referencia book_stats y bloquearía el RENAME
+            "DROP TRIGGER IF EXISTS trigger_create_book_stats",
+            "DROP TABLE book_stats",
+            "ALTER TABLE book_stats_new RENAME TO book_stats",
+            *DatabaseSchema.get_indexes(  # Índices de stats
+                "idx_book_stats_downloads_book_id", "idx_book_stats_last_accessed",
+                "idx_book_stats_book_id_unique"
+            ),
+            *DatabaseSchema.get_triggers("trigger_create_book_stats")  # Trigger para crear stats
+        ]
+
+    def _migration_v8_prefix_search_indexes(self) -> List[str]:
+        """Migración v8 - índices NOCASE para la búsqueda por prefijo."""
+        return [
+            *DatabaseSchema.get_indexes(  # Índices NOCASE de books
+                "idx_books_title_nocase", "idx_books_alt_title_nocase", "idx_books_author_nocase"
+            )
+        ]
+
+    def _migration_v9_drop_redundant_indexes(self) -> List[str]:
+        """Migración v9 - quitar índices simples cubiertos por los compuestos."""
+        return [
+            "DROP INDEX IF EXISTS idx_books_title",  # cubierto por idx_books_title_author
+            "DROP INDEX IF EXISTS idx_books_language"  # cubierto por idx_books_language_type
+        ]
+
+    def _migration_v10_updated_at_when_clause(self) -> List[str]:
+        """Migración v10 - triggers updated_at con WHEN para evitar el UPDATE doble."""
+        return [
+            "DROP TRIGGER IF EXISTS trigger_books_updated_at",
+            "DROP TRIGGER IF EXISTS trigger_user_preferences_updated_at",
+            *DatabaseSchema.get_triggers(  # Triggers updated_at
+                "trigger_books_updated_at", "trigger_user_preferences_updated_at"
+            )
+        ]
+
+    def _migration_v11_drop_duplicate_stats_index(self) -> List[str]:
+        """Migración v11 - quitar el índice de book_stats(book_id) duplicado por el único."""
+        return [
+            "DROP INDEX IF EXISTS idx_book_stats_book_id"  # cubierto por idx_book_stats_book_id_unique
+        ]
+
+    def _migration_v12_drop_lower_title_indexes(self) -> List[str]:
+        """Migración v12 - quitar índices LOWER() cubiertos por los NOCASE."""
+        return [
+            "DROP INDEX IF EXISTS idx_books_title_lower",  # cubierto por idx_books_title_nocase
+            "DROP INDEX IF EXISTS idx_books_alt_title_lower"  # cubierto por idx_books_alt_title_nocase
         ]
 
     def get_schema_version_table(self) -> str:
@@ -244,19 +472,21 @@ class DatabaseOptimizer:
     """Optimizaciones y mantenimiento de base de datos."""
 
     @staticmethod
-    def get_optimization_queries() -> List[str]:
+    @lru_cache(maxsize=1)
+    def get_optimization_queries() -> Tuple[str, ...]:
         """Queries para optimización de performance."""
-        return [
+        return (
             "PRAGMA optimize",
             "ANALYZE",
             "VACUUM",
             "REINDEX"
-        ]
+        )
 
     @staticmethod
-    def get_maintenance_queries() -> List[str]:
+    @lru_cache(maxsize=1)
+    def get_maintenance_queries() -> Tuple[str, ...]:
         """Queries para mantenimiento regular."""
-        return [
+        return (
             # Limpiar registros antiguos (opcional)
             """
             DELETE
@@ -269,12 +499,13 @@ class DatabaseOptimizer:
             "ANALYZE books",
             "ANALYZE book_stats",
             "ANALYZE user_preferences"
-        ]
+        )
 
     @staticmethod
-    def get_integrity_checks() -> List[str]:
+    @lru_cache(maxsize=1)
+    def get_integrity_checks() -> Tuple[str, ...]:
         """Queries para verificar integridad."""
-        return [
+        return (
             "PRAGMA integrity_check",
             "PRAGMA foreign_key_check",
 
@@ -285,19 +516,22 @@ class DatabaseOptimizer:
                      LEFT JOIN books b ON bs.book_id = b.book_id
             WHERE b.book_id IS NULL
             """
-        ]
+        )
 
 
 class DatabaseConstants:
     """Constantes específicas de base de datos."""
 
     # Configuración SQLite
+    # El orden importa: WAL y mmap antes que el resto para que las primeras
+    # lecturas ya usen páginas mapeadas
     SQLITE_PRAGMA_SETTINGS = {
         'journal_mode': 'WAL',
+        'mmap_size': 268435456,  # 256MB
         'synchronous': 'NORMAL',
-        'cache_size': -64000,  # 64MB en KB negativos
+        'cache_size': -65536,  # 64MiB en KiB negativos
         'temp_store': 'MEMORY',
-        'mmap_size': 268435456,  # 256MB
+        'wal_autocheckpoint': 0,  # checkpoints en hilo propio (ver WAL_CHECKPOINT_INTERVAL)
         'foreign_keys': 'ON'
     }
 
@@ -311,11 +545,26 @@ class DatabaseConstants:
     # Configuración de backup
     BACKUP_RETENTION_DAYS = 30
     BACKUP_PREFIX = "zeepubsbot_backup"
+    BACKUP_PAGES_PER_STEP = 1024  # páginas por paso de la API de backup
+    BACKUP_ONE_SHOT_MAX_BYTES = 16 * 1024 * 1024  # por debajo se copia en un solo paso
 
     # Performance
     DEFAULT_PAGE_SIZE = 4096
     DEFAULT_CACHE_SIZE_MB = 64
     CONNECTION_POOL_SIZE = 10
+    CACHED_STATEMENTS = 256  # sentencias preparadas por conexión
+    FETCH_CHUNK_SIZE = 500  # filas por fetchmany en lecturas en streaming
+    WAL_CHECKPOINT_INTERVAL = 60  # segundos entre checkpoints del WAL
+    INTEGRITY_CHECK_INTERVAL = 7 * 86400  # segundos; integrity_check completo semanal
+
+    # Buffer de contadores de book_stats (write-behind)
+    STATS_FLUSH_INTERVAL = 1.0  # segundos
+    STATS_FLUSH_THRESHOLD = 256  # eventos pendientes
+
+    # Caché de lectura por book_id
+    READ_CACHE_SIZE = 2048
+    READ_CACHE_TTL = 60  # segundos
+    CATALOG_CACHE_TTL = 300  # segundos; refresca el orden por descargas
 
 
 def get_database_config() -> DatabaseConfig:
@@ -3,17 +3,104 @@ Conexión y gestión de base de datos para ZeepubsBot.
 Maneja conexiones SQLite, pool de conexiones y operaciones base.
 """
 
+import functools
+import logging
+import queue
+import reprlib
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Generator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Generator
 
 from config.bot_config import get_config, get_logger
-from data.database_config import get_db_config, DatabaseSchema, DatabaseConstants, DatabaseMigrator
+from data.database_config import (
+    get_db_config, DatabaseSchema, DatabaseConstants, DatabaseMigrator, DatabaseOptimizer
+)
 from utils.error_handler import log_service_error
 
 
+# Scripts precalculados: una sola llamada a executescript por conexión/arranque
+_PRAGMA_SCRIPT = "".join(
+    f"PRAGMA {pragma} = {value};\n"
+    for pragma, value in DatabaseConstants.SQLITE_PRAGMA_SETTINGS.items()
+)
+_PRAGMA_SCRIPT_WAL2 = _PRAGMA_SCRIPT.replace("journal_mode = WAL;", "journal_mode = WAL2;")
+_INDEXES_SCRIPT = "".join(f"{sql};\n" for sql in DatabaseSchema.get_indexes_definition())
+_TRIGGERS_SCRIPT = "".join(f"{sql};\n" for sql in DatabaseSchema.get_triggers_definition())
+
+# SQL propio del gestor como constantes: el mismo texto reutiliza la sentencia
+# preparada en la caché de cada conexión (cached_statements)
+_SQL_JOURNAL_MODE = "PRAGMA journal_mode"
+_SQL_JOURNAL_MODE_WAL = "PRAGMA journal_mode = WAL"
+_SQL_WAL_CHECKPOINT = "PRAGMA wal_checkpoint(TRUNCATE)"
+_SQL_WAL_CHECKPOINT_PASSIVE = "PRAGMA wal_checkpoint(PASSIVE)"
+_SQL_PAGE_COUNT_SIZE = "SELECT page_count, page_size FROM pragma_page_count, pragma_page_size"
+_SQL_SCHEMA_VERSION = "SELECT MAX(version) FROM schema_version"
+_SQL_INSERT_SCHEMA_VERSION = "INSERT INTO schema_version (version, description) VALUES (?, ?)"
+
+# Estadísticas en una sola sentencia (book_stats existe desde la migración v2)
+_SQL_DATABASE_STATS = """
+    SELECT (SELECT COUNT(*) FROM books),
+           (SELECT COUNT(*) FROM book_stats),
+           (SELECT page_count FROM pragma_page_count),
+           (SELECT page_size FROM pragma_page_size),
+           (SELECT MAX(version) FROM schema_version)
+"""
+
+
+_RAISE = object()
+
+# Profundidad de operaciones _db_op anidadas en el hilo actual
+_op_state = threading.local()
+
+
+def _report_error(error: Exception, context: Dict[str, Any]) -> None:
+    """Registra el error con log_service_error una sola vez aunque se relance."""
+    if getattr(error, "_db_reported", False):
+        return
+
+    log_service_error("DatabaseConnection", error, context)
+    try:
+        error._db_reported = True
+    except AttributeError:
+        pass
+
+
+def _db_op(operation: str, default: Any = _RAISE) -> Callable:
+    """
+    Decorador que registra los errores de una operación con log_service_error.
+
+    Sin default relanza la excepción; con default la retorna en su lugar
+    (si es invocable, p.ej. dict, retorna default()). Si relanza dentro de
+    otra operación _db_op, el registro queda para la más externa.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            depth = getattr(_op_state, "depth", 0)
+            _op_state.depth = depth + 1
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                if depth == 0 or default is not _RAISE:
+                    context = {"operation": operation}
+                    if args:
+                        context["args"] = reprlib.repr(args)
+                    _report_error(e, context)
+
+                if default is _RAISE:
+                    raise
+                return default() if callable(default) else default
+            finally:
+                _op_state.depth = depth
+        return wrapper
+    return decorator
+
+
 class DatabaseConnection:
     """Gestor de conexiones a base de datos SQLite."""
 
@@ -22,409 +109,608 @@ class DatabaseConnection:
         self.app_config = get_config()
         self.db_config = get_db_config()
         self.logger = get_logger(__name__)
-        self._lock = threading.RLock()
-        self._connections = {}
+        self._lock = threading.Lock()
+
+        # Única conexión de escritura, serializada por su propio lock
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+
+        # Pool acotado de conexiones de solo lectura (query_only), creadas bajo demanda
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(
+            maxsize=self.db_config.max_connections
+        )
+        self._readers_created = 0
+
+        # Versión del schema, fijada por _run_migrations al inicializar
+        self._schema_version = 0
 
         # Configuración de base de datos
         self.db_path = Path(self.db_config.database_path)
+        self._journal_mode = "wal2" if self.db_config.enable_wal2 else "wal"
+        self._pragma_script = _PRAGMA_SCRIPT_WAL2 if self.db_config.enable_wal2 else _PRAGMA_SCRIPT
         self._initialize_database()
 
+        # Checkpoints del WAL fuera del camino de los COMMIT (wal_autocheckpoint = 0)
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread = threading.Thread(
+            target=self._checkpoint_loop, name="sqlite-wal-checkpoint", daemon=True
+        )
+        self._checkpoint_thread.start()
+
     def _initialize_database(self) -> None:
         """Inicializa la base de datos y ejecuta migraciones."""
         try:
             with self.get_connection() as conn:
                 self._setup_connection_settings(conn)
-                self._run_migrations(conn)
-                self._create_indexes(conn)
-                self._create_triggers(conn)
-                self._verify_database_integrity(conn)
+
+                # Con el schema ya en la última versión, índices y triggers existen
+                if self._run_migrations(conn):
+                    self._create_indexes(conn)
+                    self._create_triggers(conn)
+
+                # Al arrancar solo quick_check; integrity_check completo en run_maintenance
+                self._verify_database_integrity(conn, quick=True)
 
             self.logger.info(f"Base de datos inicializada: {self.db_path}")
 
         except Exception as e:
-            log_service_error("DatabaseConnection", e, {"db_path": str(self.db_path)})
+            _report_error(e, {"db_path": str(self.db_path)})
             raise RuntimeError(f"Error inicializando base de datos: {e}")
 
+    @_db_op("setup_connection")
     def _setup_connection_settings(self, conn: sqlite3.Connection) -> None:
         """Configura settings óptimos para la conexión."""
-        try:
-            cursor = conn.cursor()
+        # Aplicar configuración optimizada
+        conn.executescript(self._pragma_script)
+
+        # journal_mode devuelve el modo efectivo (p.ej. no WAL en sistemas de archivos de red)
+        journal_mode = conn.execute(_SQL_JOURNAL_MODE).fetchone()[0].lower()
+
+        if journal_mode != self._journal_mode and self._journal_mode == "wal2":
+            # SQLite sin soporte WAL2 ignora el modo; una BD ya en WAL tampoco
+            # puede pasar directamente a WAL2. Se vuelve a WAL para el resto
+            self.logger.warning(f"No se pudo activar WAL2 (modo actual: {journal_mode}); se usa WAL")
+            self._journal_mode = "wal"
+            self._pragma_script = _PRAGMA_SCRIPT
+            journal_mode = conn.execute(_SQL_JOURNAL_MODE_WAL).fetchone()[0].lower()
+
+        if journal_mode != self._journal_mode:
+            self.logger.warning(f"SQLite no pudo activar WAL; modo actual: {journal_mode}")
+
+        self.logger.debug("Configuración de conexión aplicada")
+
+    @_db_op("run_migrations")
+    def _run_migrations(self, conn: sqlite3.Connection) -> int:
+        """Ejecuta migraciones de base de datos y retorna cuántas se aplicaron."""
+        cursor = conn.cursor()
+
+        # Crear tabla de versiones si no existe
+        migrator = DatabaseMigrator()
+        cursor.execute(migrator.get_schema_version_table())
+
+        # Obtener versión actual
+        cursor.execute(_SQL_SCHEMA_VERSION)
+        result = cursor.fetchone()
+        current_version = result[0] if result[0] else 0
+
+        # Ejecutar migraciones pendientes
+        migrations = migrator.get_migrations()
+        applied = 0
+        for version, commands in migrations.items():
+            if version > current_version:
+                applied += 1
+                self.logger.info(f"Ejecutando migración v{version}")
+
+                for command in commands:
+                    cursor.execute(command)
 
-            # Aplicar configuración optimizada
-            for pragma, value in DatabaseConstants.SQLITE_PRAGMA_SETTINGS.items():
-                cursor.execute(f"PRAGMA {pragma} = {value}")
+                # Registrar migración aplicada
+                cursor.execute(
+                    _SQL_INSERT_SCHEMA_VERSION,
+                    (version, f"Migration v{version}")
+                )
+                current_version = version
 
-            self.logger.debug("Configuración de conexión aplicada")
+        conn.commit()
+        # Las migraciones solo corren al arrancar: la versión no cambia después
+        self._schema_version = current_version
+        self.logger.debug("Migraciones completadas: %d aplicadas", applied)
+        return applied
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"operation": "setup_connection"})
-            raise
+    @_db_op("create_indexes")
+    def _create_indexes(self, conn: sqlite3.Connection) -> None:
+        """Crea índices para optimización."""
+        conn.executescript(_INDEXES_SCRIPT)
+        self.logger.debug("Índices creados/verificados")
 
-    def _run_migrations(self, conn: sqlite3.Connection) -> None:
-        """Ejecuta migraciones de base de datos."""
+    @_db_op("create_triggers")
+    def _create_triggers(self, conn: sqlite3.Connection) -> None:
+        """Crea triggers automáticos."""
+        conn.executescript(_TRIGGERS_SCRIPT)
+        self.logger.debug("Triggers creados/verificados")
+
+    @_db_op("integrity_check")
+    def _verify_database_integrity(self, conn: sqlite3.Connection, quick: bool = False) -> None:
+        """
+        Verifica la integridad de la base de datos.
+
+        quick=True usa PRAGMA quick_check, que omite la consistencia de índices
+        pero detecta corrupción del archivo; solo el chequeo completo actualiza
+        el marcador.
+        """
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA quick_check" if quick else "PRAGMA integrity_check")
+        result = cursor.fetchone()
+
+        if result[0] != "ok":
+            raise RuntimeError(f"Verificación de integridad falló: {result[0]}")
+
+        if not quick:
+            self._integrity_marker.touch()
+        self.logger.debug("Integridad de base de datos verificada")
+
+    @property
+    def _integrity_marker(self) -> Path:
+        """Archivo junto a la BD cuyo mtime marca la última verificación correcta."""
+        return self.db_path.with_name(f"{self.db_path.name}.integrity")
+
+    def _integrity_check_due(self) -> bool:
+        """Indica si pasó INTEGRITY_CHECK_INTERVAL desde la última verificación."""
         try:
-            cursor = conn.cursor()
+            age = time.time() - self._integrity_marker.stat().st_mtime
+        except OSError:
+            return True
+
+        return age >= DatabaseConstants.INTEGRITY_CHECK_INTERVAL
+
+    def _checkpoint_loop(self) -> None:
+        """Hilo de fondo que vuelca y trunca el WAL periódicamente."""
+        while not self._checkpoint_stop.wait(DatabaseConstants.WAL_CHECKPOINT_INTERVAL):
+            self.checkpoint()
+
+    @_db_op("wal_checkpoint", default=False)
+    def checkpoint(self) -> bool:
+        """Ejecuta PRAGMA wal_checkpoint(TRUNCATE) en la conexión de escritura."""
+        # Tras close_all_connections no se reabre la conexión de escritura
+        if self._checkpoint_stop.is_set():
+            return False
 
-            # Crear tabla de versiones si no existe
-            migrator = DatabaseMigrator()
-            cursor.execute(migrator.get_schema_version_table())
+        with self.get_write_connection() as conn:
+            busy, wal_pages, checkpointed = conn.execute(_SQL_WAL_CHECKPOINT).fetchone()
 
-            # Obtener versión actual
-            cursor.execute("SELECT MAX(version) FROM schema_version")
-            result = cursor.fetchone()
-            current_version = result[0] if result[0] else 0
+        self.logger.debug(
+            "Checkpoint WAL: %d/%d páginas, bloqueado=%s", checkpointed, wal_pages, bool(busy)
+        )
+        return not busy
 
-            # Ejecutar migraciones pendientes
-            migrations = migrator.get_migrations()
-            for version, commands in migrations.items():
-                if version > current_version:
-                    self.logger.info(f"Ejecutando migración v{version}")
+    @contextmanager
+    def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """Context manager para obtener la conexión de escritura (alias de get_write_connection)."""
+        with self.get_write_connection() as conn:
+            yield conn
 
-                    for command in commands:
-                        cursor.execute(command)
+    @contextmanager
+    def get_write_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """Context manager que presta en exclusiva la única conexión de escritura."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._create_connection()
 
-                    # Registrar migración aplicada
-                    cursor.execute(
-                        "INSERT INTO schema_version (version, description) VALUES (?, ?)",
-                        (version, f"Migration v{version}")
-                    )
+            conn = self._writer
 
-            conn.commit()
-            self.logger.debug("Migraciones completadas")
+            try:
+                yield conn
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"operation": "run_migrations"})
-            raise
+            except Exception:
+                # El registro del error queda para quien lo capture (_db_op)
+                # Deshacer lo pendiente; si la conexión no responde, descartarla
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                    self._writer = None
+                raise
+
+    @contextmanager
+    def get_read_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """Context manager que presta una conexión de solo lectura del pool."""
+        conn = self._acquire_reader()
 
-    def _create_indexes(self, conn: sqlite3.Connection) -> None:
-        """Crea índices para optimización."""
         try:
-            cursor = conn.cursor()
+            yield conn
 
-            for index_sql in DatabaseSchema.get_indexes_definition():
-                cursor.execute(index_sql)
+        finally:
+            self._release_reader(conn)
 
-            conn.commit()
-            self.logger.debug("Índices creados/verificados")
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Toma una lectora libre, crea otra si no se alcanzó el máximo o espera."""
+        try:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"operation": "create_indexes"})
-            raise
+        with self._lock:
+            create = self._readers_created < self.db_config.max_connections
+            if create:
+                self._readers_created += 1
+
+        if create:
+            try:
+                return self._create_connection(read_only=True)
+            except Exception:
+                with self._lock:
+                    self._readers_created -= 1
+                raise
 
-    def _create_triggers(self, conn: sqlite3.Connection) -> None:
-        """Crea triggers automáticos."""
         try:
-            cursor = conn.cursor()
+            return self._read_pool.get(timeout=self.db_config.connection_timeout)
+        except queue.Empty:
+            raise RuntimeError("No hay conexiones de lectura disponibles en el pool")
 
-            for trigger_sql in DatabaseSchema.get_triggers_definition():
-                cursor.execute(trigger_sql)
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        """Devuelve una lectora al pool."""
+        try:
+            self._read_pool.put_nowait(conn)
+        except queue.Full:
+            # El pool se vació con close_all_connections mientras estaba prestada
+            conn.close()
 
-            conn.commit()
-            self.logger.debug("Triggers creados/verificados")
+    @_db_op("create_connection")
+    def _create_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Crea una nueva conexión a la base de datos."""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            timeout=float(self.db_config.connection_timeout),
+            cached_statements=DatabaseConstants.CACHED_STATEMENTS,
+            # Lectoras en autocommit: sin transacción abierta entre consultas
+            isolation_level=None if read_only else ""
+        )
+
+        # page_size solo puede fijarse en una BD vacía (luego requiere VACUUM),
+        # y antes de activar WAL
+        if not read_only and conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            conn.execute(f"PRAGMA page_size = {DatabaseConstants.DEFAULT_PAGE_SIZE}")
+
+        # Aplicar configuración inicial
+        self._setup_connection_settings(conn)
+
+        # Traza de cada sentencia solo con DEBUG activo al crear la conexión
+        if self.logger.isEnabledFor(logging.DEBUG):
+            conn.set_trace_callback(functools.partial(self.logger.debug, "SQL: %s"))
+
+        if read_only:
+            conn.execute("PRAGMA query_only = 1")
+            # Row factory para resultados como dict; la escritora solo lee por
+            # posición (PRAGMA, RETURNING) y se queda con tuplas
+            conn.row_factory = sqlite3.Row
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"operation": "create_triggers"})
-            raise
+        return conn
 
-    def _verify_database_integrity(self, conn: sqlite3.Connection) -> None:
-        """Verifica la integridad de la base de datos."""
-        try:
+    @_db_op("execute_query")
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[Tuple] = None,
+        raw: bool = False
+    ) -> List[sqlite3.Row]:
+        """
+        Ejecuta consulta SELECT y retorna resultados.
+
+        Con raw=True las filas son tuplas simples en lugar de sqlite3.Row,
+        más baratas cuando el llamador las lee por posición.
+        """
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("PRAGMA integrity_check")
-            result = cursor.fetchone()
+            if raw:
+                cursor.row_factory = None
 
-            if result[0] != "ok":
-                raise RuntimeError(f"Verificación de integridad falló: {result[0]}")
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
 
-            self.logger.debug("Integridad de base de datos verificada")
+            results = cursor.fetchall()
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"operation": "integrity_check"})
-            raise
+            self.logger.debug("Query ejecutada: %d resultados", len(results))
+            return results
 
-    @contextmanager
-    def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Context manager para obtener conexión thread-safe."""
-        thread_id = threading.get_ident()
+    @_db_op("execute_command")
+    def execute_command(
+        self,
+        command: str,
+        params: Optional[Tuple] = None
+    ) -> int:
+        """Ejecuta comando INSERT/UPDATE/DELETE y retorna filas afectadas."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
 
-        try:
-            with self._lock:
-                if thread_id not in self._connections:
-                    self._connections[thread_id] = self._create_connection()
+            if params:
+                cursor.execute(command, params)
+            else:
+                cursor.execute(command)
 
-                conn = self._connections[thread_id]
+            conn.commit()
+            rows_affected = cursor.rowcount
 
-            yield conn
+            self.logger.debug("Comando ejecutado: %d filas afectadas", rows_affected)
+            return rows_affected
+
+    def execute_read(
+        self,
+        query: str,
+        params: Optional[Tuple] = None
+    ) -> List[Tuple]:
+        """Ejecuta consulta SELECT en una conexión lectora del pool y retorna tuplas."""
+        # Camino rápido para las lecturas calientes del repositorio: sin context
+        # manager ni logging, solo préstamo de la lectora y execute/fetchall
+        try:
+            conn = self._acquire_reader()
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                return cursor.execute(query, params or ()).fetchall()
+            finally:
+                self._release_reader(conn)
 
         except Exception as e:
-            log_service_error("DatabaseConnection", e, {"thread_id": thread_id})
-            # Limpiar conexión corrupta
-            with self._lock:
-                if thread_id in self._connections:
-                    try:
-                        self._connections[thread_id].close()
-                    except:
-                        pass
-                    del self._connections[thread_id]
+            _report_error(e, {
+                "query": query[:100],
+                "params": str(params) if params else None
+            })
             raise
 
-    def _create_connection(self) -> sqlite3.Connection:
-        """Crea una nueva conexión a la base de datos."""
+    def execute_scalar(
+        self,
+        query: str,
+        params: Optional[Tuple] = None
+    ) -> Any:
+        """Ejecuta consulta SELECT y retorna la primera columna de la primera fila."""
         try:
-            conn = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False,
-                timeout=float(self.db_config.connection_timeout)
-            )
-
-            # Row factory para resultados como dict
-            conn.row_factory = sqlite3.Row
-
-            # Aplicar configuración inicial
-            self._setup_connection_settings(conn)
-
-            return conn
+            conn = self._acquire_reader()
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                row = cursor.execute(query, params or ()).fetchone()
+                return row[0] if row else None
+            finally:
+                self._release_reader(conn)
 
         except Exception as e:
-            log_service_error("DatabaseConnection", e, {"db_path": str(self.db_path)})
+            _report_error(e, {
+                "query": query[:100],
+                "params": str(params) if params else None
+            })
             raise
 
-    def execute_query(
+    def iter_query(
         self,
         query: str,
-        params: Optional[Tuple] = None
-    ) -> List[sqlite3.Row]:
-        """Ejecuta consulta SELECT y retorna resultados."""
+        params: Optional[Tuple] = None,
+        chunk_size: int = DatabaseConstants.FETCH_CHUNK_SIZE,
+        raw: bool = False
+    ) -> Generator[sqlite3.Row, None, None]:
+        """Ejecuta consulta SELECT y entrega filas por bloques con fetchmany."""
         try:
-            with self.get_connection() as conn:
+            with self.get_read_connection() as conn:
                 cursor = conn.cursor()
+                if raw:
+                    cursor.row_factory = None
 
                 if params:
                     cursor.execute(query, params)
                 else:
                     cursor.execute(query)
 
-                results = cursor.fetchall()
-
-                self.logger.debug(f"Query ejecutada: {len(results)} resultados")
-                return results
+                while rows := cursor.fetchmany(chunk_size):
+                    yield from rows
 
         except Exception as e:
-            log_service_error("DatabaseConnection", e, {
+            _report_error(e, {
                 "query": query[:100],
                 "params": str(params) if params else None
             })
             raise
 
-    def execute_command(
+    @_db_op("execute_returning")
+    def execute_returning(
         self,
         command: str,
         params: Optional[Tuple] = None
-    ) -> int:
-        """Ejecuta comando INSERT/UPDATE/DELETE y retorna filas afectadas."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+    ) -> List[Tuple]:
+        """Ejecuta INSERT/UPDATE/DELETE ... RETURNING y retorna las filas como tuplas."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
 
-                if params:
-                    cursor.execute(command, params)
-                else:
-                    cursor.execute(command)
+            if params:
+                cursor.execute(command, params)
+            else:
+                cursor.execute(command)
 
+            # Consumir RETURNING por completo antes del commit
+            rows = cursor.fetchall()
+            conn.commit()
+
+            self.logger.debug("Comando ejecutado: %d filas retornadas", len(rows))
+            return rows
+
+    @_db_op("execute_many")
+    def execute_many(
+        self,
+        command: str,
+        params_list: List[Tuple]
+    ) -> int:
+        """Ejecuta un comando con múltiples parámetros en una sola transacción."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.executemany(command, params_list)
                 conn.commit()
-                rows_affected = cursor.rowcount
+            except Exception:
+                conn.rollback()
+                raise
 
-                self.logger.debug(f"Comando ejecutado: {rows_affected} filas afectadas")
-                return rows_affected
+            rows_affected = cursor.rowcount
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {
-                "command": command[:100],
-                "params": str(params) if params else None
-            })
-            raise
+            self.logger.debug("Comando por lotes ejecutado: %d filas afectadas", rows_affected)
+            return rows_affected
 
+    @_db_op("execute_transaction", default=False)
     def execute_transaction(self, operations: List[Tuple[str, Optional[Tuple]]]) -> bool:
         """Ejecuta múltiples operaciones en una transacción."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-
-                # Iniciar transacción explícita
-                cursor.execute("BEGIN TRANSACTION")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
 
-                try:
-                    for operation, params in operations:
-                        if params:
-                            cursor.execute(operation, params)
+            try:
+                # with conn: commit al salir, rollback si hay excepción
+                with conn:
+                    # Operaciones consecutivas con el mismo SQL van en un solo executemany
+                    for operation, group in groupby(operations, key=itemgetter(0)):
+                        batch = [params or () for _, params in group]
+                        if len(batch) > 1:
+                            cursor.executemany(operation, batch)
                         else:
-                            cursor.execute(operation)
-
-                    conn.commit()
-                    self.logger.debug(f"Transacción completada: {len(operations)} operaciones")
-                    return True
-
-                except Exception as e:
-                    conn.rollback()
-                    self.logger.warning(f"Transacción revertida: {e}")
-                    raise
+                            cursor.execute(operation, batch[0])
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {
-                "operations_count": len(operations)
-            })
-            return False
+                self.logger.debug("Transacción completada: %d operaciones", len(operations))
+                return True
 
-    def get_last_insert_id(self) -> int:
-        """Obtiene el ID de la última inserción."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                return cursor.lastrowid
+            except Exception as e:
+                self.logger.warning(f"Transacción revertida: {e}")
+                raise
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
-            return 0
+    @_db_op("execute_insert")
+    def execute_insert(
+        self,
+        command: str,
+        params: Optional[Tuple] = None
+    ) -> int:
+        """Ejecuta un INSERT y retorna el rowid de la fila insertada."""
+        with self.get_connection() as conn:
+            cursor = conn.execute(command, params or ())
+            conn.commit()
+            return cursor.lastrowid
 
+    @_db_op("database_stats", default=dict)
     def get_database_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de la base de datos."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+        with self.get_read_connection() as conn:
+            books_count, stats_records, page_count, page_size, schema_version = (
+                conn.execute(_SQL_DATABASE_STATS).fetchone()
+            )
 
-                # Estadísticas básicas
-                cursor.execute("SELECT COUNT(*) FROM books")
-                books_count = cursor.fetchone()[0]
-
-                # Verificar si existe tabla book_stats
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='book_stats'
-                """)
-                has_stats = bool(cursor.fetchone())
-
-                stats_data = {}
-                if has_stats:
-                    cursor.execute("SELECT COUNT(*) FROM book_stats")
-                    stats_data['stats_records'] = cursor.fetchone()[0]
-
-                # Información de la BD
-                cursor.execute("PRAGMA page_count")
-                page_count = cursor.fetchone()[0]
-
-                cursor.execute("PRAGMA page_size")
-                page_size = cursor.fetchone()[0]
-
-                # Versión del schema
-                cursor.execute("SELECT MAX(version) FROM schema_version")
-                schema_version = cursor.fetchone()[0] or 0
-
-                db_size_bytes = page_count * page_size
-
-                return {
-                    'books_count': books_count,
-                    'db_size_mb': round(db_size_bytes / (1024 * 1024), 2),
-                    'schema_version': schema_version,
-                    'page_count': page_count,
-                    'page_size': page_size,
-                    'db_path': str(self.db_path),
-                    **stats_data
-                }
+        db_size_bytes = page_count * page_size
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
-            return {}
+        return {
+            'books_count': books_count,
+            'db_size_mb': round(db_size_bytes / (1024 * 1024), 2),
+            'schema_version': schema_version or 0,
+            'page_count': page_count,
+            'page_size': page_size,
+            'db_path': str(self.db_path),
+            'stats_records': stats_records
+        }
 
+    @_db_op("backup_database", default=False)
     def backup_database(self, backup_path: str) -> bool:
         """Crea respaldo de la base de datos."""
-        try:
-            backup_file = Path(backup_path)
-            backup_file.parent.mkdir(parents=True, exist_ok=True)
-
-            with self.get_connection() as source:
-                backup_conn = sqlite3.connect(str(backup_file))
-                try:
-                    source.backup(backup_conn)
-                    self.logger.info(f"Backup creado: {backup_path}")
-                    return True
-                finally:
-                    backup_conn.close()
-
-        except Exception as e:
-            log_service_error("DatabaseConnection", e, {"backup_path": backup_path})
-            return False
+        backup_file = Path(backup_path)
+        backup_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.get_connection() as source:
+            # Volcar el WAL antes para copiar lo menos posible de él
+            source.execute(_SQL_WAL_CHECKPOINT_PASSIVE)
+
+            page_count, page_size = source.execute(_SQL_PAGE_COUNT_SIZE).fetchone()
+            if page_count * page_size <= DatabaseConstants.BACKUP_ONE_SHOT_MAX_BYTES:
+                pages = -1
+            else:
+                pages = DatabaseConstants.BACKUP_PAGES_PER_STEP
+
+            backup_conn = sqlite3.connect(str(backup_file))
+            try:
+                source.backup(backup_conn, pages=pages, sleep=0)
+                self.logger.info(f"Backup creado: {backup_path}")
+                return True
+            finally:
+                backup_conn.close()
 
+    @_db_op("optimize_database", default=False)
     def optimize_database(self) -> bool:
         """Optimiza la base de datos."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
 
-                # Ejecutar optimizaciones
-                from data.database_config import DatabaseOptimizer
+            # Ejecutar optimizaciones
+            for query in DatabaseOptimizer.get_optimization_queries():
+                cursor.execute(query)
 
-                for query in DatabaseOptimizer.get_optimization_queries():
-                    cursor.execute(query)
-
-                self.logger.info("Base de datos optimizada")
-                return True
-
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
-            return False
+            self.logger.info("Base de datos optimizada")
+            return True
 
+    @_db_op("run_maintenance", default=False)
     def run_maintenance(self) -> bool:
         """Ejecuta mantenimiento de la base de datos."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-
-                # Ejecutar queries de mantenimiento
-                from data.database_config import DatabaseOptimizer
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
 
-                for query in DatabaseOptimizer.get_maintenance_queries():
-                    try:
-                        cursor.execute(query)
-                        conn.commit()
-                    except Exception as e:
-                        self.logger.warning(f"Error en query de mantenimiento: {e}")
-                        # Continuar con otros queries
+            # Ejecutar queries de mantenimiento
+            for query in DatabaseOptimizer.get_maintenance_queries():
+                try:
+                    cursor.execute(query)
+                    conn.commit()
+                except Exception as e:
+                    self.logger.warning(f"Error en query de mantenimiento: {e}")
+                    # Continuar con otros queries
 
-                self.logger.info("Mantenimiento de BD completado")
-                return True
+            if self._integrity_check_due():
+                self._verify_database_integrity(conn)
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
-            return False
+            self.logger.info("Mantenimiento de BD completado")
+            return True
 
     def get_schema_version(self) -> int:
         """Obtiene la versión actual del schema."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT MAX(version) FROM schema_version")
-                result = cursor.fetchone()
-                return result[0] if result[0] else 0
-
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
-            return 0
+        return self._schema_version
 
+    @_db_op("close_connections", default=None)
     def close_all_connections(self) -> None:
         """Cierra todas las conexiones activas."""
-        try:
-            with self._lock:
-                for thread_id, conn in self._connections.items():
-                    try:
-                        conn.close()
-                        self.logger.debug(f"Conexión cerrada para thread {thread_id}")
-                    except Exception as e:
-                        self.logger.warning(f"Error cerrando conexión {thread_id}: {e}")
+        # Detener el hilo de checkpoints antes de cerrar la conexión de escritura
+        stop = getattr(self, "_checkpoint_stop", None)
+        if stop is not None:
+            stop.set()
+            thread = self._checkpoint_thread
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join()
+
+        with self._write_lock:
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                    self.logger.debug("Conexión de escritura cerrada")
+                except Exception as e:
+                    self.logger.warning(f"Error cerrando conexión de escritura: {e}")
 
-                self._connections.clear()
+                self._writer = None
 
-        except Exception as e:
-            log_service_error("DatabaseConnection", e)
+        with self._lock:
+            while True:
+                try:
+                    conn = self._read_pool.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    conn.close()
+                except Exception as e:
+                    self.logger.warning(f"Error cerrando conexión de lectura: {e}")
+
+            self._readers_created = 0
 
     def __del__(self):
         """Destructor para limpiar conexiones."""
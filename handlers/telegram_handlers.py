@@ -3,8 +3,16 @@ Handlers simplificados para comandos y callbacks de Telegram.
 Código limpio, simple y sin errores.
 """
 
+import asyncio
+import functools
 import json
-from typing import Dict, Optional, Any
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Optional, Any, Mapping
 import time
 
 from telegram import Update, InlineKeyboardMarkup
@@ -17,6 +25,186 @@ from utils.error_handler import log_service_error
 from utils.message_formatter import MessageFormatter
 
 
+_FALLBACK_MESSAGES = {
+    'bienvenida': '¡Bienvenido a ZeepubsBot! 📚\n\nTu biblioteca personal de libros EPUB.',
+    'ayuda': '🔧 <b>Ayuda de ZeepubsBot</b>\n\nUsa los comandos para explorar la biblioteca.',
+    'info': '📖 <b>Acerca de ZeepubsBot</b>\n\nBot para gestión de libros EPUB con recomendaciones IA.'
+}
+
+_HELP_COMMANDS = (
+    '/start - Mensaje de bienvenida del bot',
+    '/help - Muestra esta ayuda',
+    '/ebook <nombre> - Busca libros por título',
+    '/list - Lista todos los libros disponibles',
+    '/recommend <preferencias> - Recomendaciones personalizadas',
+    '/about - Información sobre el bot'
+)
+
+_ADMIN_HELP_COMMANDS = (
+    '',  # Línea en blanco
+    '🔧 **Comandos de Administrador:**',
+    '/activity - Ver estado de recomendaciones automáticas',
+    '/activity start/stop - Iniciar/detener actividad',
+    '/activity force - Forzar recomendación inmediata',
+    '/activity interval <mins> - Cambiar frecuencia'
+)
+
+_RECOMMEND_HELP = """
+🔮 **Recomendaciones de Neko-Chan**
+
+Para obtener recomendaciones personalizadas, describe qué tipo de libro te gustaría leer:
+
+📚 **Ejemplos de uso:**
+• `/recommend Novelas de terror psicológico`
+• `/recommend Libros de ciencia ficción espacial`
+• `/recommend Romance histórico ambientado en el siglo XIX`
+• `/recommend Ensayos sobre filosofía moderna`
+• `/recommend Algo ligero y divertido para leer`
+
+💡 **Consejos:**
+- Sé específico sobre géneros, temas o estilos
+- Menciona autores que te gustan
+- Describe el tipo de historia que buscas
+- Indica si prefieres algo ligero o profundo
+
+✨ **Neko-Chan analizará tu solicitud y te recomendará los mejores libros de nuestra biblioteca que coincidan con tus gustos!**
+"""
+
+_UNAUTHORIZED_MSG = """
+    🚫 **Acceso Restringido**
+
+    La subida de libros está limitada al administrador del bot.
+
+    📚 **¿Quieres agregar un libro?**
+    • Contacta al administrador del bot
+    • Sugiere libros que te gustaría ver en la biblioteca
+    • Usa los comandos disponibles para explorar el catálogo actual
+
+    💡 **Comandos disponibles:**
+    • `/list` - Ver todos los libros
+    • `/ebook [título]` - Buscar libros específicos  
+    • `/recommend [tema]` - Obtener recomendaciones
+    • `/help` - Ver todos los comandos
+
+    ✨ ¡Disfruta leyendo la biblioteca actual!
+    """
+
+_ACTIVITY_HELP_MSG = """
+    🤖 **Comandos de Actividad Automática**
+
+    **Comandos básicos:**
+    • `/activity` - Ver estado actual
+    • `/activity start` - Iniciar recomendaciones en este chat
+    • `/activity stop` - Detener todas las recomendaciones
+    • `/activity status` - Estado detallado
+
+    **Gestión de chats:**
+    • `/activity add` - Agregar este chat a recomendaciones
+    • `/activity remove` - Remover este chat de recomendaciones  
+    • `/activity chats` - Ver lista de chats activos
+
+    **Configuración:**
+    • `/activity interval <mins>` - Cambiar frecuencia
+    • `/activity force` - Recomendación inmediata
+
+    **Ejemplos:**
+    • `/activity start` - En un canal para que reciba recomendaciones
+    • `/activity interval 45` - Cada 45 minutos
+    • `/activity force` - Enviar recomendación ahora
+
+    💡 *Solo el administrador puede usar estos comandos.*
+    💡 *Ejecuta `/activity start` en cada canal donde quieras recomendaciones.*
+    """
+
+_INTERVAL_USAGE_MSG = (
+    "❓ **Uso correcto:**\n"
+    "`/activity interval <minutos>`\n\n"
+    "**Ejemplos:**\n"
+    "• `/activity interval 30` - Cada 30 minutos\n"
+    "• `/activity interval 60` - Cada hora\n"
+    "• `/activity interval 15` - Cada 15 minutos"
+)
+
+# Etiqueta del tipo de chat en las respuestas de /activity ("chat" por defecto)
+_CHAT_TYPE_LABEL: Mapping[str, str] = MappingProxyType({"channel": "canal"})
+
+_START_SERVICE_MSG = (
+    "✅ **Servicio iniciado correctamente**\n\n"
+    "🤖 Neko-chan enviará recomendaciones automáticas a este {label} cada 30 minutos.\n"
+    "📊 Usa `/activity status` para monitorear."
+)
+
+_ADD_CHAT_MSG = (
+    "✅ **Chat agregado**\n\n"
+    "Este {label} ahora recibirá recomendaciones automáticas.\n"
+    "📊 Total de chats activos: {count}"
+)
+
+LANGUAGE_NAMES: Mapping[str, str] = MappingProxyType({
+    'es': 'Español',
+    'en': 'English',
+    'fr': 'Français',
+    'de': 'Deutsch',
+    'it': 'Italiano',
+    'pt': 'Português',
+    'unknown': 'Desconocido'
+})
+
+_STATS_HEADER = """
+    📊 <b>Estadísticas de la Biblioteca</b>
+
+    📚 <b>Colección:</b>
+    • Libros disponibles: <b>{total_books}</b>
+    • Libros descargados: <b>{downloaded_books}</b> de {total_books}
+    • Base de datos: <b>{db_size} MB</b>
+
+    📈 <b>Actividad:</b>
+    • Total descargas: <b>{total_downloads:,}</b>
+    • Total búsquedas: <b>{total_searches:,}</b>"""
+
+_STATS_FOOTER = (
+    "\n\n🤖 <b>Servicios:</b>"
+    "\n• Recomendaciones IA: {ai_status}"
+    "\n• Búsqueda: <b>✅ Activo</b>"
+    "\n• Subida de archivos: <b>✅ Activo</b>"
+    "\n\n💡 <b>Consejos:</b>"
+    "\n• Usa <code>/list</code> para ver todos los libros"
+    "\n• Usa <code>/recommend [tema]</code> para recomendaciones"
+)
+
+# Formato horario de la última recomendación en /activity
+_HM_FMT = "%H:%M"
+
+# Límites de título leídos una vez: _shorten_title está memoizado
+_TITLE_TRUNCATE_LENGTH = BotConstants.TITLE_TRUNCATE_LENGTH
+_TITLE_PARTS_LENGTH = BotConstants.TITLE_PARTS_LENGTH
+
+
+def _truncate(text: str, length: int) -> str:
+    """Recorta texto a length caracteres añadiendo puntos suspensivos."""
+    return text[:length] + "..." if len(text) > length else text
+
+
+def _search_sid(search_term: str) -> str:
+    """Identificador corto y estable de una búsqueda para el callback_data."""
+    return format(zlib.crc32(search_term.encode("utf-8")) & 0xFFFFFF, '06x')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_messages() -> Mapping[str, str]:
+    """Carga una sola vez los mensajes del bot desde JSON, con fallbacks."""
+    try:
+        # Bytes directos: json.loads detecta UTF-8 sin capa de decodificación de texto
+        messages = json.loads(Path(BotConstants.MESSAGES_FILE).read_bytes())
+        if messages:
+            return MappingProxyType(messages)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger = get_logger(__name__)
+        logger.warning(f"No se pudieron cargar mensajes: {e}")
+
+    return MappingProxyType(_FALLBACK_MESSAGES)
+
+
 class TelegramHandlers:
     """Maneja todos los comandos y callbacks de Telegram."""
 
@@ -29,47 +217,71 @@ class TelegramHandlers:
         self.config = get_config()
         self.logger = get_logger(__name__)
         self.message_formatter = MessageFormatter()
-        self.bot_messages = self._load_messages()
-
-    def _load_messages(self) -> Dict[str, str]:
-        """Carga mensajes del bot desde archivo JSON con fallbacks."""
-        try:
-            with open(BotConstants.MESSAGES_FILE, encoding="UTF-8") as file:
-                messages = json.load(file)
-                if messages:
-                    return messages
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            self.logger.warning(f"No se pudieron cargar mensajes: {e}")
-
-        # Fallback messages
-        return {
-            'bienvenida': '¡Bienvenido a ZeepubsBot! 📚\n\nTu biblioteca personal de libros EPUB.',
-            'ayuda': '🔧 <b>Ayuda de ZeepubsBot</b>\n\nUsa los comandos para explorar la biblioteca.',
-            'info': '📖 <b>Acerca de ZeepubsBot</b>\n\nBot para gestión de libros EPUB con recomendaciones IA.'
+        self.bot_messages = _load_messages()
+
+        # La configuración es inmutable: se fijan una vez los ids autorizados
+        self._dev_ids = frozenset((self.config.developer_chat_id,))
+        self._uploader_ids = self._dev_ids | {1366342064}
+
+        # Subcomandos de /activity: (handler, recibe chat_id)
+        self._activity_dispatch = {
+            "start": (self._handle_activity_start, True),
+            "stop": (self._handle_activity_stop, False),
+            "add": (self._handle_add_chat, True),
+            "remove": (self._handle_remove_chat, True),
+            "force": (self._handle_force_recommendation, False),
+            "status": (self._show_detailed_status, False),
+            "chats": (self._show_active_chats, False)
         }
 
+        # Mensajes estáticos renderizados una sola vez
+        self._welcome_message = self.bot_messages.get('bienvenida')
+        help_base = self.bot_messages.get('ayuda')
+        self._help_message = self.message_formatter.format_help_message(
+            help_base, _HELP_COMMANDS
+        )
+        self._admin_help_message = self.message_formatter.format_help_message(
+            help_base, _HELP_COMMANDS + _ADMIN_HELP_COMMANDS
+        )
+
+        # Caché de /about: (instante monotónico, estadísticas) y texto renderizado
+        self._stats_cache: Optional[tuple] = None
+        self._stats_ttl = BotConstants.STATS_CACHE_TTL
+        self._about_text: Optional[tuple] = None
+
+        # Caché de /activity chats: (chats activos, texto renderizado)
+        self._chats_msg_cache: tuple = (None, None)
+
+        # Resultados de /ebook por sid (LRU) para paginar sin repetir la búsqueda
+        self._search_cache: OrderedDict = OrderedDict()
+
+        # Referencias a tareas en segundo plano para que no las recoja el GC
+        self._background_tasks: set = set()
+
+        # Límite de llamadas a BD simultáneas fuera del event loop
+        self._db_semaphore = asyncio.Semaphore(self.config.db_concurrency)
+
+    async def _db(self, fn, *args, **kwargs):
+        """Ejecuta una llamada bloqueante del repositorio en un hilo de trabajo."""
+        async with self._db_semaphore:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /start."""
         try:
-            message = self.bot_messages.get('bienvenida')
-            await self._send_message(update, message, ParseMode.HTML)
+            await self._send_message(update, self._welcome_message, ParseMode.HTML)
         except Exception as e:
             await self._handle_error(update, e, "start")
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /help."""
         try:
-            commands = [
-                '/start - Mensaje de bienvenida del bot',
-                '/help - Muestra esta ayuda',
-                '/ebook <nombre> - Busca libros por título',
-                '/list - Lista todos los libros disponibles',
-                '/recommend <preferencias> - Recomendaciones personalizadas',
-                '/about - Información sobre el bot'
-            ]
-
-            base_message = self.bot_messages.get('ayuda')
-            message = self.message_formatter.format_help_message(base_message, commands)
+            # Incluir comandos de administrador para el desarrollador
+            if update.effective_user.id in self._dev_ids:
+                message = self._admin_help_message
+            else:
+                message = self._help_message
+
             await self._send_message(update, message, ParseMode.HTML)
         except Exception as e:
             await self._handle_error(update, e, "help")
@@ -80,292 +292,118 @@ class TelegramHandlers:
             # Obtener estadísticas detalladas
             stats = await self._get_detailed_stats()
 
-            base_message = self.bot_messages.get('info')
-            detailed_stats = self._format_detailed_stats(stats)
-
-            message = f"{base_message}\n\n{detailed_stats}"
-            await self._send_message(update, message, ParseMode.HTML)
-        except Exception as e:
-            await self._handle_error(update, e, "about")
-
-    async def _get_detailed_stats(self) -> Dict[str, Any]:
-        """Obtiene estadísticas detalladas del sistema."""
-        try:
-            stats = {}
-
-            # Estadísticas básicas de libros
-            stats['total_books'] = self.book_repository.count()
-
-            # Obtener estadísticas de base de datos
-            db_stats = self.book_repository.db.get_database_stats()
-            stats['db_size_mb'] = db_stats.get('db_size_mb', 0)
-
-            # Estadísticas de uso
-            usage_stats = await self._get_usage_statistics()
-            stats.update(usage_stats)
-
-            # Libros más populares
-            popular_books = self.book_repository.find_popular(3)
-            stats['popular_books'] = popular_books
-
-            # Estadísticas de idiomas
-            language_stats = await self._get_language_statistics()
-            stats['languages'] = language_stats
-
-            # Estado de servicios
-            rec_status = self.recommendation_service.get_service_status()
-            stats['ai_available'] = rec_status.get('service_ready', False)
-
-            return stats
-
-        except Exception as e:
-            self.logger.error(f"Error obteniendo estadísticas detalladas: {e}")
-            return {'total_books': self.book_repository.count()}
-
-    async def _get_usage_statistics(self) -> Dict[str, Any]:
-        """Obtiene estadísticas de uso de la biblioteca."""
-        try:
-            # Query para obtener estadísticas agregadas
-            query = """
-                    SELECT COUNT(*)                                              as books_with_stats, \
-                           SUM(downloads)                                        as total_downloads, \
-                           SUM(searches)                                         as total_searches, \
-                           AVG(downloads)                                        as avg_downloads, \
-                           MAX(downloads)                                        as max_downloads, \
-                           COUNT(CASE WHEN downloads > 0 THEN 1 END)             as downloaded_books, \
-                           COUNT(CASE WHEN last_accessed IS NOT NULL THEN 1 END) as accessed_books
-                    FROM book_stats \
-                    """
-
-            results = self.book_repository.db.execute_query(query)
-
-            if results:
-                row = results[0]
-                return {
-                    'total_downloads': row['total_downloads'] or 0,
-                    'total_searches': row['total_searches'] or 0,
-                    'avg_downloads': round(row['avg_downloads'] or 0, 1),
-                    'max_downloads': row['max_downloads'] or 0,
-                    'downloaded_books': row['downloaded_books'] or 0,
-                    'accessed_books': row['accessed_books'] or 0
-                }
-
-            return {}
-
-        except Exception as e:
-            self.logger.error(f"Error obteniendo estadísticas de uso: {e}")
-            return {}
-
-    # Actualización del método about_command en telegram_handlers.py
-
-    async def about_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Maneja el comando /about con estadísticas detalladas."""
-        try:
-            # Obtener estadísticas detalladas
-            stats = await self._get_detailed_stats()
+            # Reutilizar el texto mientras las estadísticas sean las mismas
+            if self._about_text and self._about_text[0] is stats:
+                message = self._about_text[1]
+            else:
+                base_message = self.bot_messages.get('info')
+                detailed_stats = self._format_detailed_stats(stats)
 
-            base_message = self.bot_messages.get('info')
-            detailed_stats = self._format_detailed_stats(stats)
+                message = f"{base_message}\n\n{detailed_stats}"
+                self._about_text = (stats, message)
 
-            message = f"{base_message}\n\n{detailed_stats}"
             await self._send_message(update, message, ParseMode.HTML)
         except Exception as e:
             await self._handle_error(update, e, "about")
 
+    def invalidate_stats_cache(self) -> None:
+        """Descarta las estadísticas cacheadas de /about."""
+        self._stats_cache = None
+        self._about_text = None
+
     async def _get_detailed_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas detalladas del sistema."""
-        try:
-            stats = {}
-
-            # Estadísticas básicas de libros
-            stats['total_books'] = self.book_repository.count()
+        now = time.monotonic()
+        if self._stats_cache and now - self._stats_cache[0] < self._stats_ttl:
+            return self._stats_cache[1]
 
-            # Obtener estadísticas de base de datos
-            db_stats = self.book_repository.db.get_database_stats()
-            stats['db_size_mb'] = db_stats.get('db_size_mb', 0)
-
-            # Estadísticas de uso
-            usage_stats = await self._get_usage_statistics()
-            stats.update(usage_stats)
+        try:
+            # Agregados de BD y estado de servicios en paralelo
+            (stats, popular_books), rec_status = await asyncio.gather(
+                self._db(self._fetch_stats_bundle),
+                self._db(self.recommendation_service.get_service_status)
+            )
+            if not stats:
+                raise RuntimeError("Estadísticas de biblioteca no disponibles")
 
-            # Libros más populares
-            popular_books = self.book_repository.find_popular(3)
             stats['popular_books'] = popular_books
-
-            # Estadísticas de idiomas
-            language_stats = await self._get_language_statistics()
-            stats['languages'] = language_stats
+            stats['languages'] = self._name_languages(stats['languages'])
 
             # Estado de servicios
-            rec_status = self.recommendation_service.get_service_status()
             stats['ai_available'] = rec_status.get('service_ready', False)
 
+            self._stats_cache = (now, stats)
             return stats
 
         except Exception as e:
             self.logger.error(f"Error obteniendo estadísticas detalladas: {e}")
-            return {'total_books': self.book_repository.count()}
-
-    async def _get_usage_statistics(self) -> Dict[str, Any]:
-        """Obtiene estadísticas de uso de la biblioteca."""
-        try:
-            # Query para obtener estadísticas agregadas
-            query = """
-                    SELECT COUNT(*)                                              as books_with_stats, \
-                           SUM(downloads)                                        as total_downloads, \
-                           SUM(searches)                                         as total_searches, \
-                           AVG(downloads)                                        as avg_downloads, \
-                           MAX(downloads)                                        as max_downloads, \
-                           COUNT(CASE WHEN downloads > 0 THEN 1 END)             as downloaded_books, \
-                           COUNT(CASE WHEN last_accessed IS NOT NULL THEN 1 END) as accessed_books
-                    FROM book_stats \
-                    """
-
-            results = self.book_repository.db.execute_query(query)
-
-            if results:
-                row = results[0]
-                return {
-                    'total_downloads': row['total_downloads'] or 0,
-                    'total_searches': row['total_searches'] or 0,
-                    'avg_downloads': round(row['avg_downloads'] or 0, 1),
-                    'max_downloads': row['max_downloads'] or 0,
-                    'downloaded_books': row['downloaded_books'] or 0,
-                    'accessed_books': row['accessed_books'] or 0
-                }
-
-            return {}
-
-        except Exception as e:
-            self.logger.error(f"Error obteniendo estadísticas de uso: {e}")
-            return {}
+            return {'total_books': await self._db(self.book_repository.count)}
 
-    async def _get_language_statistics(self) -> Dict[str, int]:
-        """Obtiene estadísticas por idioma."""
-        try:
-            query = """
-                    SELECT language, COUNT(*) as count
-                    FROM books
-                    GROUP BY language
-                    ORDER BY count DESC \
-                    """
-
-            results = self.book_repository.db.execute_query(query)
-
-            language_names = {
-                'es': 'Español',
-                'en': 'English',
-                'fr': 'Français',
-                'de': 'Deutsch',
-                'it': 'Italiano',
-                'pt': 'Português',
-                'unknown': 'Desconocido'
-            }
+    def _fetch_stats_bundle(self):
+        """Lee agregados de la biblioteca y libros populares (bloqueante)."""
+        return self.book_repository.get_library_stats(), self.book_repository.find_popular_with_downloads(3)
 
-            languages = {}
-            for row in results:
-                lang_code = row['language']
-                lang_name = language_names.get(lang_code, lang_code.title())
-                languages[lang_name] = row['count']
+    def _name_languages(self, language_counts) -> Dict[str, int]:
+        """Traduce los códigos de idioma del conteo a nombres legibles."""
+        languages = {}
+        for lang_code, count in language_counts:
+            lang_code = lang_code or 'unknown'
+            lang_name = LANGUAGE_NAMES.get(lang_code, lang_code.title())
+            languages[lang_name] = count
 
-            return languages
-
-        except Exception as e:
-            self.logger.error(f"Error obteniendo estadísticas de idiomas: {e}")
-            return {}
+        return languages
 
     def _format_detailed_stats(self, stats: Dict[str, Any]) -> str:
         """Formatea las estadísticas en un mensaje HTML atractivo."""
-        try:
-            total_books = stats.get('total_books', 0)
-            total_downloads = stats.get('total_downloads', 0)
-            total_searches = stats.get('total_searches', 0)
-            downloaded_books = stats.get('downloaded_books', 0)
-            db_size = stats.get('db_size_mb', 0)
-            ai_available = stats.get('ai_available', False)
-
-            # Sección principal
-            message = f"""
-    📊 <b>Estadísticas de la Biblioteca</b>
-
-    📚 <b>Colección:</b>
-    • Libros disponibles: <b>{total_books}</b>
-    • Libros descargados: <b>{downloaded_books}</b> de {total_books}
-    • Base de datos: <b>{db_size} MB</b>
-
-    📈 <b>Actividad:</b>
-    • Total descargas: <b>{total_downloads:,}</b>
-    • Total búsquedas: <b>{total_searches:,}</b>"""
-
-            # Agregar promedio si hay datos
-            if stats.get('avg_downloads', 0) > 0:
-                avg_downloads = stats.get('avg_downloads', 0)
-                max_downloads = stats.get('max_downloads', 0)
-                message += f"\n• Promedio descargas: <b>{avg_downloads}</b>"
-                message += f"\n• Libro más popular: <b>{max_downloads}</b> descargas"
-
-            # Libros populares
-            popular_books = stats.get('popular_books', [])
-            if popular_books:
-                message += f"\n\n🔥 <b>Más Populares:</b>"
-                for i, book in enumerate(popular_books[:3], 1):
-                    title = book.title[:30] + "..." if len(book.title) > 30 else book.title
-                    # Obtener descargas del libro
-                    book_stats = self.book_repository.get_book_stats(book.book_id)
-                    downloads = book_stats.downloads if book_stats else 0
-                    message += f"\n{i}. <i>{title}</i> ({downloads} desc.)"
-
-            # Idiomas
-            languages = stats.get('languages', {})
-            if languages:
-                message += f"\n\n🌐 <b>Por Idioma:</b>"
-                for lang, count in list(languages.items())[:3]:
-                    message += f"\n• {lang}: <b>{count}</b>"
-
-            # Estado de servicios
-            message += f"\n\n🤖 <b>Servicios:</b>"
-            message += f"\n• Recomendaciones IA: {'✅ Activo' if ai_available else '⚠️ No disponible'}"
-            message += f"\n• Búsqueda: <b>✅ Activo</b>"
-            message += f"\n• Subida de archivos: <b>✅ Activo</b>"
-
-            # Información adicional
-            message += f"\n\n💡 <b>Consejos:</b>"
-            message += f"\n• Usa <code>/list</code> para ver todos los libros"
-            message += f"\n• Usa <code>/recommend [tema]</code> para recomendaciones"
-
-            return message.strip()
-
-        except Exception as e:
-            self.logger.error(f"Error formateando estadísticas: {e}")
-            total_books = stats.get('total_books', 0)
-            return f"📊 <b>Estadísticas:</b>\n• Libros disponibles: <b>{total_books}</b>"
-
-    # También agregar este método auxiliar para obtener el libro más descargado
-    async def _get_most_popular_book(self) -> Optional[str]:
-        """Obtiene el libro más popular por descargas."""
-        try:
-            query = """
-                    SELECT b.title, bs.downloads
-                    FROM books b
-                             JOIN book_stats bs ON b.book_id = bs.book_id
-                    WHERE bs.downloads > 0
-                    ORDER BY bs.downloads DESC
-                    LIMIT 1 \
-                    """
+        total_books = stats.get('total_books', 0)
+        total_downloads = stats.get('total_downloads', 0)
+        total_searches = stats.get('total_searches', 0)
+        downloaded_books = stats.get('downloaded_books', 0)
+        db_size = stats.get('db_size_mb', 0)
+        ai_available = stats.get('ai_available', False)
+
+        # Sección principal
+        parts = [_STATS_HEADER.format(
+            total_books=total_books,
+            downloaded_books=downloaded_books,
+            db_size=db_size,
+            total_downloads=total_downloads,
+            total_searches=total_searches
+        )]
+
+        # Agregar promedio si hay datos
+        avg_downloads = stats.get('avg_downloads', 0)
+        if avg_downloads > 0:
+            max_downloads = stats.get('max_downloads', 0)
+            parts.append(
+                f"\n• Promedio descargas: <b>{avg_downloads}</b>"
+                f"\n• Libro más popular: <b>{max_downloads}</b> descargas"
+            )
 
-            results = self.book_repository.db.execute_query(query)
+        # Libros populares
+        popular_books = stats.get('popular_books', [])
+        if popular_books:
+            parts.append("\n\n🔥 <b>Más Populares:</b>")
+            parts.extend(
+                f"\n{i}. <i>{_truncate(book.title, 30)}</i> ({downloads} desc.)"
+                for i, (book, downloads) in enumerate(popular_books[:3], 1)
+            )
 
-            if results:
-                row = results[0]
-                title = row['title']
-                downloads = row['downloads']
-                return f"{title[:25]}{'...' if len(title) > 25 else ''} ({downloads} desc.)"
+        # Idiomas
+        languages = stats.get('languages', {})
+        if languages:
+            parts.append("\n\n🌐 <b>Por Idioma:</b>")
+            parts.extend(
+                f"\n• {lang}: <b>{count}</b>"
+                for lang, count in islice(languages.items(), 3)
+            )
 
-            return None
+        # Estado de servicios e información adicional
+        parts.append(_STATS_FOOTER.format(
+            ai_status='✅ Activo' if ai_available else '⚠️ No disponible'
+        ))
 
-        except Exception as e:
-            self.logger.error(f"Error obteniendo libro más popular: {e}")
-            return None
+        return "".join(parts).strip()
 
     async def book_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /ebook para buscar libros."""
@@ -376,15 +414,15 @@ class TelegramHandlers:
                 await update.message.reply_text(error_msg)
                 return
 
-            books = self.book_repository.search(book_name)
+            books = await self._db(self.book_repository.search, book_name)
             if not books:
                 error_msg = self.message_formatter.format_error_message('book_not_found')
                 await update.message.reply_text(error_msg)
                 return
 
-            # Actualizar estadísticas de búsqueda
-            for book in books:
-                self.book_repository.increment_searches(book.book_id)
+            # Actualizar estadísticas de búsqueda (solo acumula en memoria; el
+            # volcado a BD lo hace el hilo de flush del repository)
+            self.book_repository.increment_searches_bulk(book.book_id for book in books)
 
             # *** CORRECCIÓN: Convertir a tuplas correctamente ***
             books_tuples = []
@@ -428,90 +466,48 @@ class TelegramHandlers:
             }
 
             # Crear paginación con contexto de búsqueda
-            keyboard, message = self._create_book_pagination(books_tuples, 'm_ebook')
+            sid = _search_sid(book_name)
+            self._remember_search(sid, books_tuples)
+            keyboard, message = self._create_book_pagination(books_tuples, 'm_ebook', sid=sid)
             await self._send_message(update, message, ParseMode.MARKDOWN, keyboard)
 
         except Exception as e:
             await self._handle_error(update, e, "ebook")
 
-    def _cleanup_old_search_contexts(self, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Limpia contextos de búsqueda antiguos para liberar memoria."""
-        try:
-            current_time = time.time()
-
-            # Buscar claves de búsqueda antiguos (más de 1 hora)
-            keys_to_remove = []
-            for key in list(context.bot_data.keys()):  # Usar list() para evitar modificación durante iteración
-                if key.startswith('search_results_'):
-                    search_data = context.bot_data.get(key)
-                    if isinstance(search_data, dict) and 'timestamp' in search_data:
-                        if current_time - search_data['timestamp'] > 3600:  # 1 hora
-                            keys_to_remove.append(key)
-
-            # Remover contextos antiguos
-            for key in keys_to_remove:
-                context.bot_data.pop(key, None)
-
-            if keys_to_remove:
-                self.logger.debug(f"Limpiados {len(keys_to_remove)} contextos de búsqueda antiguos")
-
-        except Exception as e:
-            self.logger.debug(f"Error limpiando contextos: {e}")
-
     async def list_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /list para mostrar todos los libros."""
         try:
-            books = self.book_repository.find_all()
+            books, total_items, _ = await self._get_list_page(1)
             if not books:
                 error_msg = self.message_formatter.format_error_message('no_books')
                 await update.message.reply_text(error_msg)
                 return
 
-            # *** CORRECCIÓN: Convertir a tuplas correctamente ***
-            books_tuples = []
-            for book in books:
-                try:
-                    if hasattr(book, 'to_legacy_tuple'):
-                        books_tuples.append(book.to_legacy_tuple())
-                    elif isinstance(book, tuple):
-                        books_tuples.append(book)
-                    else:
-                        # Fallback: construir tupla manualmente
-                        book_tuple = (
-                            getattr(book, 'id', None),
-                            getattr(book, 'book_id', ''),
-                            getattr(book, 'title', 'Sin título'),
-                            getattr(book, 'alt_title', None),
-                            getattr(book, 'author', 'Autor desconocido'),
-                            getattr(book, 'description', ''),
-                            getattr(book, 'language', 'es'),
-                            getattr(book, 'type', 'book'),
-                            getattr(book, 'file_id', None),
-                            getattr(book, 'cover_id', None),
-                            getattr(book, 'isbn', None),
-                            getattr(book, 'publisher', None),
-                            getattr(book, 'year', None),
-                            getattr(book, 'file_size', None)
-                        )
-                        books_tuples.append(book_tuple)
-                except Exception as e:
-                    self.logger.warning(f"Error convirtiendo libro a tupla: {e}")
-                    continue
-
-            # Limpiar búsqueda anterior y guardar lista completa
-            user_id = update.effective_user.id
-            context.bot_data[f'search_results_{user_id}'] = {
-                'books': books_tuples,
-                'query': None,  # None indica que es lista completa
-                'timestamp': time.time()
-            }
-
-            keyboard, message = self._create_book_pagination(books_tuples, "m_list")
+            keyboard, message = self._create_book_pagination(
+                books, "m_list", total_items=total_items
+            )
             await self._send_message(update, message, ParseMode.MARKDOWN, keyboard)
 
         except Exception as e:
             await self._handle_error(update, e, "list")
 
+    async def _get_list_page(self, page: int) -> tuple:
+        """Lee de la BD solo la página pedida de /list; retorna (libros, total, página)."""
+        per_page = self.config.books_per_page
+        page = max(1, page)
+        books, total_items = await self._db(
+            self.book_repository.find_page, (page - 1) * per_page, per_page
+        )
+
+        # Página fuera de rango (el catálogo encogió): servir la última
+        if not books and total_items:
+            page = (total_items + per_page - 1) // per_page
+            books, total_items = await self._db(
+                self.book_repository.find_page, (page - 1) * per_page, per_page
+            )
+
+        return books, total_items, page
+
     async def recommend_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /recommend para recomendaciones."""
         try:
@@ -546,7 +542,7 @@ class TelegramHandlers:
             user_id = update.effective_user.id
 
             # VERIFICAR SI ES EL DESARROLLADOR
-            if not (self._is_developer(user_id) or user_id == 1366342064):
+            if user_id not in self._uploader_ids:
                 await self._send_unauthorized_message(update)
                 return
 
@@ -566,6 +562,9 @@ class TelegramHandlers:
                 if zeepubs_bot:
                     zeepubs_bot.register_new_book_command(book_data['id'])
 
+                self.invalidate_stats_cache()
+                self._search_cache.clear()
+
                 await self._send_message(update, message, ParseMode.MARKDOWN)
             else:
                 error_msg = result.get('message', 'Error procesando el archivo')
@@ -582,27 +581,8 @@ class TelegramHandlers:
     async def _send_unauthorized_message(self, update: Update) -> None:
         """Envía mensaje cuando un usuario no autorizado intenta subir archivos."""
         try:
-            unauthorized_message = """
-    🚫 **Acceso Restringido**
-
-    La subida de libros está limitada al administrador del bot.
-
-    📚 **¿Quieres agregar un libro?**
-    • Contacta al administrador del bot
-    • Sugiere libros que te gustaría ver en la biblioteca
-    • Usa los comandos disponibles para explorar el catálogo actual
-
-    💡 **Comandos disponibles:**
-    • `/list` - Ver todos los libros
-    • `/ebook [título]` - Buscar libros específicos  
-    • `/recommend [tema]` - Obtener recomendaciones
-    • `/help` - Ver todos los comandos
-
-    ✨ ¡Disfruta leyendo la biblioteca actual!
-    """
-
             await update.message.reply_text(
-                unauthorized_message,
+                _UNAUTHORIZED_MSG,
                 parse_mode=ParseMode.MARKDOWN
             )
 
@@ -619,28 +599,19 @@ class TelegramHandlers:
                 "🚫 Solo el administrador puede subir archivos."
             )
 
-    def _is_developer(self, user_id: int) -> bool:
-        """Verifica si el usuario es el desarrollador autorizado."""
-        try:
-            developer_id = self.config.developer_chat_id
-            return user_id == developer_id
-        except Exception as e:
-            self.logger.error(f"Error verificando desarrollador: {e}")
-            return False
-
     async def book_callback(self, update: Update, context: CallbackContext) -> None:
         """Maneja callbacks dinámicos de libros específicos."""
         try:
             # Extraer book_id del comando
             book_id = update.message.text.replace("/", "").replace("@ZeepubsBot", "")
 
-            book = self.book_repository.find_by_book_id(book_id)
+            book = await self._db(self.book_repository.find_by_book_id, book_id)
             if not book:
                 await update.message.reply_text("Libro no encontrado.")
                 return
 
-            # Actualizar estadísticas
-            self.book_repository.update_last_accessed(book_id)
+            # Actualizar estadísticas en paralelo con el formateo y el envío
+            self._spawn(self._db(self.book_repository.update_last_accessed, book_id))
 
             # Formatear detalles del libro
             book_dict = book.to_dict()
@@ -675,116 +646,49 @@ class TelegramHandlers:
 
             page = int(parts[1])
             menu = parts[2]
+            sid = parts[3] if len(parts) > 3 else None
 
             # Obtener libros del contexto guardado
             user_id = update.effective_user.id
             search_data = context.bot_data.get(f'search_results_{user_id}')
 
-            if search_data and 'books' in search_data:
-                # Usar resultados guardados (búsqueda o lista completa)
+            total_items = None
+            if menu == 'm_list':
+                # Lista completa: paginada directamente en SQL
+                books, total_items, page = await self._get_list_page(page)
+            elif sid:
+                # Paginación de /ebook: resultados de esa búsqueda concreta
+                books = await self._get_search_results(sid, search_data)
+            elif search_data and search_data.get('query') and 'books' in search_data:
+                # Usar resultados guardados de la última búsqueda
                 books = search_data['books']
 
                 # Verificar si los datos no son muy antiguos (30 minutos)
                 if time.time() - search_data.get('timestamp', 0) > 1800:  # 30 minutos
-                    # Datos muy antiguos, regenerar según el tipo
-                    if search_data.get('query'):
-                        # Era una búsqueda, repetir búsqueda
-                        self.logger.debug(f"Regenerando búsqueda: {search_data['query']}")
-                        book_objects = self.book_repository.search(search_data['query'])
-                    else:
-                        # Era lista completa, obtener lista actualizada
-                        self.logger.debug("Regenerando lista completa")
-                        book_objects = self.book_repository.find_all()
-
-                    # Convertir a tuplas
-                    books = []
-                    for book in book_objects:
-                        try:
-                            if hasattr(book, 'to_legacy_tuple'):
-                                books.append(book.to_legacy_tuple())
-                            elif isinstance(book, tuple):
-                                books.append(book)
-                            else:
-                                # Fallback manual
-                                book_tuple = (
-                                    getattr(book, 'id', None),
-                                    getattr(book, 'book_id', ''),
-                                    getattr(book, 'title', 'Sin título'),
-                                    getattr(book, 'alt_title', None),
-                                    getattr(book, 'author', 'Autor desconocido'),
-                                    getattr(book, 'description', ''),
-                                    getattr(book, 'language', 'es'),
-                                    getattr(book, 'type', 'book'),
-                                    getattr(book, 'file_id', None),
-                                    getattr(book, 'cover_id', None),
-                                    getattr(book, 'isbn', None),
-                                    getattr(book, 'publisher', None),
-                                    getattr(book, 'year', None),
-                                    getattr(book, 'file_size', None)
-                                )
-                                books.append(book_tuple)
-                        except Exception as e:
-                            self.logger.warning(f"Error convirtiendo libro en paginación: {e}")
-                            continue
+                    # Datos muy antiguos, repetir búsqueda
+                    self.logger.debug(f"Regenerando búsqueda: {search_data['query']}")
+                    book_objects = await self._db(self.book_repository.search, search_data['query'])
+                    books = [book.to_legacy_tuple() for book in book_objects]
 
                     # Actualizar cache
                     context.bot_data[f'search_results_{user_id}'] = {
                         'books': books,
-                        'query': search_data.get('query'),
+                        'query': search_data['query'],
                         'timestamp': time.time()
                     }
             else:
-                # Fallback: si no hay contexto, obtener todos los libros
-                self.logger.debug("No hay contexto guardado, obteniendo todos los libros")
-                book_objects = self.book_repository.find_all()
-                books = []
-
-                for book in book_objects:
-                    try:
-                        if hasattr(book, 'to_legacy_tuple'):
-                            books.append(book.to_legacy_tuple())
-                        elif isinstance(book, tuple):
-                            books.append(book)
-                        else:
-                            # Fallback manual
-                            book_tuple = (
-                                getattr(book, 'id', None),
-                                getattr(book, 'book_id', ''),
-                                getattr(book, 'title', 'Sin título'),
-                                getattr(book, 'alt_title', None),
-                                getattr(book, 'author', 'Autor desconocido'),
-                                getattr(book, 'description', ''),
-                                getattr(book, 'language', 'es'),
-                                getattr(book, 'type', 'book'),
-                                getattr(book, 'file_id', None),
-                                getattr(book, 'cover_id', None),
-                                getattr(book, 'isbn', None),
-                                getattr(book, 'publisher', None),
-                                getattr(book, 'year', None),
-                                getattr(book, 'file_size', None)
-                            )
-                            books.append(book_tuple)
-                    except Exception as e:
-                        self.logger.warning(f"Error en fallback de paginación: {e}")
-                        continue
-
-                # Guardar en contexto para futuras paginaciones
-                context.bot_data[f'search_results_{user_id}'] = {
-                    'books': books,
-                    'query': None,
-                    'timestamp': time.time()
-                }
+                # Fallback: sin contexto de búsqueda, mostrar el catálogo paginado
+                self.logger.debug("No hay contexto guardado, paginando el catálogo")
+                menu = 'm_list'
+                books, total_items, page = await self._get_list_page(page)
 
             if not books:
                 await query.edit_message_text("No hay libros disponibles")
                 return
 
             # Crear nueva paginación conservando el contexto
-            keyboard, message = self._create_book_pagination(books, menu, page)
-
-            await context.bot.send_chat_action(
-                chat_id=update.effective_chat.id,
-                action=ChatAction.TYPING
+            keyboard, message = self._create_book_pagination(
+                books, menu, page, sid, total_items
             )
 
             await query.edit_message_text(
@@ -806,7 +710,7 @@ class TelegramHandlers:
             query = update.callback_query
             book_id = query.data.split(" ", 1)[1]
 
-            book = self.book_repository.find_by_book_id(book_id)
+            book = await self._db(self.book_repository.find_by_book_id, book_id)
             if not book:
                 await query.answer("Libro no encontrado")
                 return
@@ -815,22 +719,21 @@ class TelegramHandlers:
                 await query.answer("Archivo no disponible")
                 return
 
-            # Incrementar contador de descargas
+            # Incrementar contador de descargas (en memoria, sin tocar la BD)
             self.book_repository.increment_downloads(book_id)
 
-            await context.bot.send_chat_action(
-                chat_id=update.effective_chat.id,
-                action=ChatAction.UPLOAD_DOCUMENT
-            )
-
-            # Enviar archivo
-            await context.bot.send_document(
-                chat_id=query.message.chat_id,
-                document=book.file_id,
-                caption=f"📖 {book.title}"
+            # Indicador de subida sin esperar su ida y vuelta
+            self._fire_chat_action(context, update.effective_chat.id, ChatAction.UPLOAD_DOCUMENT)
+
+            # Enviar archivo y responder al callback a la vez
+            await asyncio.gather(
+                context.bot.send_document(
+                    chat_id=query.message.chat_id,
+                    document=book.file_id,
+                    caption=f"📖 {book.title}"
+                ),
+                query.answer("📚 Descarga iniciada")
             )
-
-            await query.answer("📚 Descarga iniciada")
         except Exception as e:
             try:
                 await update.callback_query.answer("Error en descarga", show_alert=True)
@@ -838,14 +741,55 @@ class TelegramHandlers:
                 pass
             await self._handle_error(update, e, "download")
 
-    def _create_book_pagination(self, books, menu_type: str, current_page: int = 1):
-        """Crea paginación simple para libros que maneja tanto objetos Book como tuplas."""
+    def _remember_search(self, sid: str, books: list) -> None:
+        """Guarda resultados de búsqueda en la LRU acotada."""
+        self._search_cache[sid] = books
+        self._search_cache.move_to_end(sid)
+        while len(self._search_cache) > BotConstants.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+
+    async def _get_search_results(self, sid: str, search_data: Optional[Dict[str, Any]]) -> list:
+        """Recupera los resultados de una búsqueda por sid, repitiéndola si se expulsó."""
+        books = self._search_cache.get(sid)
+        if books is not None:
+            self._search_cache.move_to_end(sid)
+            return books
+
+        # Expulsada de la LRU: repetir la búsqueda si el contexto del usuario coincide
+        search_term = search_data.get('query') if search_data else None
+        if not search_term or _search_sid(search_term) != sid:
+            return []
+
+        self.logger.debug(f"Regenerando búsqueda: {search_term}")
+        books = [
+            book.to_legacy_tuple()
+            for book in await self._db(self.book_repository.search, search_term)
+        ]
+        if books:
+            self._remember_search(sid, books)
+        return books
+
+    def _create_book_pagination(
+            self,
+            books,
+            menu_type: str,
+            current_page: int = 1,
+            sid: Optional[str] = None,
+            total_items: Optional[int] = None
+    ):
+        """
+        Crea paginación simple para libros que maneja tanto objetos Book como tuplas.
+
+        Si se indica total_items, books ya es la página actual (paginada en SQL).
+        """
         try:
             if not books:
                 return InlineKeyboardMarkup([]), "No hay libros disponibles."
 
             items_per_page = self.config.books_per_page
-            total_items = len(books)
+            page_only = total_items is not None
+            if not page_only:
+                total_items = len(books)
             total_pages = (total_items + items_per_page - 1) // items_per_page
 
             # Validar página actual
@@ -855,49 +799,47 @@ class TelegramHandlers:
             header = self.message_formatter.format_book_list_header(total_items, menu_type)
 
             # Calcular índices para la página actual
-            start_index = (current_page - 1) * items_per_page
-            end_index = min(start_index + items_per_page, total_items)
+            if page_only:
+                start_index, end_index = 0, len(books)
+            else:
+                start_index = (current_page - 1) * items_per_page
+                end_index = min(start_index + items_per_page, total_items)
 
             # Formatear libros de la página - *** CORRECCIÓN PRINCIPAL ***
-            book_list = ""
+            parts = [header]
+            parts_append = parts.append
+            format_item = self.message_formatter.format_book_list_item
+            shorten_title = self._shorten_title
             for book in books[start_index:end_index]:
-                try:
-                    # *** MANEJO SEGURO DE DIFERENTES TIPOS ***
-                    if hasattr(book, 'title'):
-                        # Es un objeto Book
-                        title = book.title
-                        book_command = book.book_id
-                    elif isinstance(book, (tuple, list)) and len(book) >= 3:
-                        # Es una tupla con formato: (id, book_id, title, alt_title, author, description, ...)
-                        # Basado en tu ejemplo: (408, '5926351303f9', 'Mushoku Tensei - El Capítulo Perdido - Vol. Único', ...)
-                        title = book[2] if len(book) > 2 and book[2] else "Sin título"  # title está en posición 2
-                        book_command = book[1] if len(book) > 1 and book[1] else "unknown"  # book_id está en posición 1
-                    elif isinstance(book, dict):
-                        # Es un diccionario
-                        title = book.get('title', 'Sin título')
-                        book_command = book.get('book_id', 'unknown')
-                    else:
-                        # Fallback para tipos desconocidos
-                        self.logger.warning(f"Tipo de libro desconocido: {type(book)}")
-                        title = "Libro desconocido"
-                        book_command = "unknown"
-
-                    # Acortar título si es muy largo
-                    title = self._shorten_title(title)
-
-                    # Formatear línea del libro
-                    book_list += self.message_formatter.format_book_list_item(title, book_command)
+                # *** MANEJO SEGURO DE DIFERENTES TIPOS ***
+                if hasattr(book, 'title'):
+                    # Es un objeto Book
+                    title = book.title
+                    book_command = book.book_id
+                elif isinstance(book, (tuple, list)) and len(book) >= 3:
+                    # Es una tupla con formato: (id, book_id, title, alt_title, author, description, ...)
+                    # Basado en tu ejemplo: (408, '5926351303f9', 'Mushoku Tensei - El Capítulo Perdido - Vol. Único', ...)
+                    title = book[2] if len(book) > 2 and book[2] else "Sin título"  # title está en posición 2
+                    book_command = book[1] if len(book) > 1 and book[1] else "unknown"  # book_id está en posición 1
+                elif isinstance(book, dict):
+                    # Es un diccionario
+                    title = book.get('title', 'Sin título')
+                    book_command = book.get('book_id', 'unknown')
+                else:
+                    # Fallback para tipos desconocidos
+                    self.logger.warning(f"Tipo de libro desconocido: {type(book)}")
+                    title = "Libro desconocido"
+                    book_command = "unknown"
 
-                except Exception as e:
-                    self.logger.warning(f"Error formateando libro en paginación: {e}")
-                    # Continuar con el siguiente libro en lugar de fallar completamente
-                    continue
+                # Acortar título si es muy largo y formatear línea del libro
+                parts_append(format_item(shorten_title(title), book_command))
 
-            message = header + book_list
+            message = "".join(parts)
 
             # Crear teclado de navegación si hay múltiples páginas
+            callback_menu = f"{menu_type}#{sid}" if sid else menu_type
             keyboard = self.message_formatter.create_pagination_keyboard(
-                current_page, total_pages, menu_type
+                current_page, total_pages, callback_menu
             ) if total_pages > 1 else InlineKeyboardMarkup([])
 
             return keyboard, message
@@ -909,41 +851,35 @@ class TelegramHandlers:
 
     def _create_recommendation_help_message(self) -> str:
         """Crea mensaje de ayuda para el comando /recommend."""
-        return """
-🔮 **Recomendaciones de Neko-Chan**
-
-Para obtener recomendaciones personalizadas, describe qué tipo de libro te gustaría leer:
+        return _RECOMMEND_HELP
 
-📚 **Ejemplos de uso:**
-• `/recommend Novelas de terror psicológico`
-• `/recommend Libros de ciencia ficción espacial`
-• `/recommend Romance histórico ambientado en el siglo XIX`
-• `/recommend Ensayos sobre filosofía moderna`
-• `/recommend Algo ligero y divertido para leer`
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _shorten_title(title: str) -> str:
+        """Acorta título usando configuración de la aplicación (memoizado)."""
+        if not title:
+            return "Sin título"
 
-💡 **Consejos:**
-- Sé específico sobre géneros, temas o estilos
-- Menciona autores que te gustan
-- Describe el tipo de historia que buscas
-- Indica si prefieres algo ligero o profundo
+        if len(title) <= _TITLE_TRUNCATE_LENGTH:
+            return title
 
-✨ **Neko-Chan analizará tu solicitud y te recomendará los mejores libros de nuestra biblioteca que coincidan con tus gustos!**
-"""
+        return f"{title[:_TITLE_PARTS_LENGTH]}...{title[-_TITLE_PARTS_LENGTH:]}"
 
-    def _shorten_title(self, title: str) -> str:
-        """Acorta título usando configuración de la aplicación."""
-        if not title:
-            return "Sin título"
+    def _spawn(self, coro) -> None:
+        """Lanza una corrutina en segundo plano conservando su referencia."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
 
-        try:
-            max_length = BotConstants.TITLE_TRUNCATE_LENGTH
-            if len(title) <= max_length:
-                return title
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        """Libera la tarea terminada y registra su error, si lo hubo."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning(f"Error en tarea en segundo plano: {task.exception()}")
 
-            parts_length = BotConstants.TITLE_PARTS_LENGTH
-            return f"{title[:parts_length]}...{title[-parts_length:]}"
-        except Exception:
-            return title[:40] + "..." if len(title) > 40 else title
+    def _fire_chat_action(self, context: CallbackContext, chat_id: int, action: str) -> None:
+        """Envía una acción de chat en segundo plano, sin bloquear la respuesta."""
+        self._spawn(context.bot.send_chat_action(chat_id=chat_id, action=action))
 
     async def _send_message(
             self,
@@ -952,9 +888,8 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
             parse_mode: str = ParseMode.HTML,
             keyboard: Optional[InlineKeyboardMarkup] = None
     ) -> None:
-        """Envía un mensaje con acción de typing."""
+        """Envía un mensaje de texto como respuesta."""
         try:
-            await update.effective_chat.send_action(ChatAction.TYPING)
             await update.message.reply_text(
                 message,
                 parse_mode=parse_mode,
@@ -973,7 +908,6 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     ) -> None:
         """Envía información del libro con portada."""
         try:
-            await update.effective_chat.send_action(ChatAction.TYPING)
             await update.message.reply_photo(
                 photo=cover_id,
                 caption=message,
@@ -1003,15 +937,9 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     async def activity_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Maneja el comando /activity para controlar recomendaciones automáticas."""
         try:
-            user_id = update.effective_user.id
-            chat_id = update.effective_chat.id  # ← IMPORTANTE: Capturar el chat_id
-
-            # Solo el desarrollador puede controlar este servicio
-            if not self._is_developer(user_id):
-                await update.message.reply_text(
-                    "🚫 Solo el administrador puede controlar las recomendaciones automáticas."
-                )
-                return
+            # Solo llega el desarrollador: filters.User en el registro del handler
+            chat = update.effective_chat
+            chat_id = chat.id  # ← IMPORTANTE: Capturar el chat_id
 
             # Obtener servicio
             zeepubs_bot = context.application.bot_data.get('zeepubs_bot')
@@ -1029,27 +957,23 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
                 await self._show_activity_status(update, activity_service)
                 return
 
-            command = args[0].lower()
-
-            # Comandos disponibles
-            if command == "start":
-                await self._handle_activity_start(update, activity_service, chat_id)  # ← Pasar chat_id
-            elif command == "stop":
-                await self._handle_activity_stop(update, activity_service)
-            elif command == "add":
-                await self._handle_add_chat(update, activity_service, chat_id)
-            elif command == "remove":
-                await self._handle_remove_chat(update, activity_service, chat_id)
-            elif command == "force":
-                await self._handle_force_recommendation(update, activity_service)
-            elif command == "interval":
+            command = args[0].casefold()
+
+            # interval necesita los argumentos; el resto se resuelve en la tabla
+            if command == "interval":
                 await self._handle_interval_config(update, activity_service, args)
-            elif command == "status":
-                await self._show_detailed_status(update, activity_service)
-            elif command == "chats":
-                await self._show_active_chats(update, activity_service)
-            else:
+                return
+
+            entry = self._activity_dispatch.get(command)
+            if entry is None:
                 await self._show_activity_help(update)
+                return
+
+            handler, needs_chat = entry
+            if needs_chat:
+                await handler(update, activity_service, chat_id)  # ← Pasar chat_id
+            else:
+                await handler(update, activity_service)
 
         except Exception as e:
             await self._handle_error(update, e, "activity")
@@ -1058,13 +982,16 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
         """Muestra lista de chats activos."""
         try:
             status = activity_service.get_service_status()
-            active_chats = status.get('active_chats', [])
+            active_chats = tuple(status.get('active_chats', ()))
 
-            if not active_chats:
-                message = "📝 **Chats Activos**\n\nNo hay chats recibiendo recomendaciones automáticas."
-            else:
-                chat_list = "\n".join([f"• Chat ID: `{chat_id}`" for chat_id in active_chats])
-                message = f"""
+            # Mismo conjunto de chats que la última vez: reutilizar el texto
+            cached_chats, message = self._chats_msg_cache
+            if active_chats != cached_chats:
+                if not active_chats:
+                    message = "📝 **Chats Activos**\n\nNo hay chats recibiendo recomendaciones automáticas."
+                else:
+                    chat_list = "\n".join([f"• Chat ID: `{chat_id}`" for chat_id in active_chats])
+                    message = f"""
     📝 **Chats Activos** ({len(active_chats)})
 
     {chat_list}
@@ -1074,6 +1001,7 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     • `/activity remove` - Remover este chat
     • `/activity start` - Iniciar servicio en este chat
     """
+                self._chats_msg_cache = (active_chats, message)
 
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
@@ -1091,32 +1019,34 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     async def _handle_activity_start(self, update, activity_service, chat_id) -> None:
         """Inicia el servicio de actividad con el chat actual."""
         try:
+            # Una sola lectura del estado y del conjunto de chats
             status = activity_service.get_service_status()
+            active = activity_service.active_chats
+            running = status.get('is_running', False)
+            next_eta = status.get('next_recommendation_eta', 'calculando...')
+            already_in = chat_id in active
 
-            if status.get('is_running', False):
+            if running:
                 # Si ya está corriendo, agregar este chat
-                if chat_id not in activity_service.active_chats:
+                if not already_in:
+                    count_after = len(active) + 1
                     activity_service.add_chat(chat_id)
                     await update.message.reply_text(
                         f"✅ **Chat agregado a recomendaciones automáticas**\n\n"
-                        f"📊 Chats activos: {len(activity_service.active_chats)}\n"
-                        f"⏰ Próxima recomendación: {status.get('next_recommendation_eta', 'calculando...')}"
+                        f"📊 Chats activos: {count_after}\n"
+                        f"⏰ Próxima recomendación: {next_eta}"
                     )
                 else:
                     await update.message.reply_text(
                         f"ℹ️ **Este chat ya recibe recomendaciones automáticas**\n\n"
-                        f"⏰ Próxima recomendación: {status.get('next_recommendation_eta', 'calculando...')}"
+                        f"⏰ Próxima recomendación: {next_eta}"
                     )
             else:
                 # Iniciar servicio con este chat
                 success = await activity_service.start_activity_service(chat_id)
                 if success:
-                    chat_type = "canal" if update.effective_chat.type == "channel" else "chat"
-                    await update.message.reply_text(
-                        f"✅ **Servicio iniciado correctamente**\n\n"
-                        f"🤖 Neko-chan enviará recomendaciones automáticas a este {chat_type} cada 30 minutos.\n"
-                        f"📊 Usa `/activity status` para monitorear."
-                    )
+                    label = _CHAT_TYPE_LABEL.get(update.effective_chat.type, "chat")
+                    await update.message.reply_text(_START_SERVICE_MSG.format(label=label))
                 else:
                     await update.message.reply_text("❌ Error iniciando el servicio.")
         except Exception as e:
@@ -1141,9 +1071,15 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     async def _handle_force_recommendation(self, update, activity_service) -> None:
         """Fuerza una recomendación inmediata."""
         try:
-            await update.message.reply_text("🔄 Preparando recomendación inmediata...")
-
-            success = await activity_service.force_recommendation()
+            # El aviso sale mientras la recomendación ya se está preparando; gather
+            # espera a ambos para que el aviso nunca llegue después del resultado
+            _, success = await asyncio.gather(
+                update.message.reply_text("🔄 Preparando recomendación inmediata..."),
+                activity_service.force_recommendation(),
+                return_exceptions=True
+            )
+            if isinstance(success, BaseException):
+                raise success
             if success:
                 await update.message.reply_text("✅ Recomendación enviada correctamente.")
             else:
@@ -1155,15 +1091,7 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
         """Configura el intervalo de recomendaciones."""
         try:
             if len(args) < 2:
-                await update.message.reply_text(
-                    "❓ **Uso correcto:**\n"
-                    "`/activity interval <minutos>`\n\n"
-                    "**Ejemplos:**\n"
-                    "• `/activity interval 30` - Cada 30 minutos\n"
-                    "• `/activity interval 60` - Cada hora\n"
-                    "• `/activity interval 15` - Cada 15 minutos",
-                    parse_mode=ParseMode.MARKDOWN
-                )
+                await update.message.reply_text(_INTERVAL_USAGE_MSG, parse_mode=ParseMode.MARKDOWN)
                 return
 
             try:
@@ -1203,33 +1131,7 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
 
     async def _show_activity_help(self, update) -> None:
         """Muestra ayuda del comando activity."""
-        help_message = """
-    🤖 **Comandos de Actividad Automática**
-
-    **Comandos básicos:**
-    • `/activity` - Ver estado actual
-    • `/activity start` - Iniciar recomendaciones en este chat
-    • `/activity stop` - Detener todas las recomendaciones
-    • `/activity status` - Estado detallado
-
-    **Gestión de chats:**
-    • `/activity add` - Agregar este chat a recomendaciones
-    • `/activity remove` - Remover este chat de recomendaciones  
-    • `/activity chats` - Ver lista de chats activos
-
-    **Configuración:**
-    • `/activity interval <mins>` - Cambiar frecuencia
-    • `/activity force` - Recomendación inmediata
-
-    **Ejemplos:**
-    • `/activity start` - En un canal para que reciba recomendaciones
-    • `/activity interval 45` - Cada 45 minutos
-    • `/activity force` - Enviar recomendación ahora
-
-    💡 *Solo el administrador puede usar estos comandos.*
-    💡 *Ejecuta `/activity start` en cada canal donde quieras recomendaciones.*
-    """
-        await update.message.reply_text(help_message, parse_mode="Markdown")
+        await update.message.reply_text(_ACTIVITY_HELP_MSG, parse_mode="Markdown")
 
     def _format_activity_status(self, status: dict) -> str:
         """Formatea el estado básico del servicio."""
@@ -1243,33 +1145,32 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
             status_emoji = "🟢" if is_running else "🔴"
             status_text = "Activo" if is_running else "Detenido"
 
-            message = f"""
+            parts = [f"""
 🤖 **Estado del Servicio de Actividad**
 
 {status_emoji} **Estado:** {status_text}
 ⏰ **Intervalo:** {interval} minutos
 📚 **Libros en cache:** {recent_count}
-"""
+"""]
 
             if last_rec:
                 try:
-                    from datetime import datetime
                     last_time = datetime.fromisoformat(last_rec)
-                    message += f"🕐 **Última recomendación:** {last_time.strftime('%H:%M')}\n"
+                    parts.append(f"🕐 **Última recomendación:** {last_time.strftime(_HM_FMT)}\n")
                 except:
-                    message += f"🕐 **Última recomendación:** {last_rec}\n"
+                    parts.append(f"🕐 **Última recomendación:** {last_rec}\n")
 
             if next_eta and is_running:
-                message += f"⏳ **Próxima recomendación:** {next_eta}\n"
+                parts.append(f"⏳ **Próxima recomendación:** {next_eta}\n")
 
-            message += f"""
+            parts.append("""
 💡 **Comandos disponibles:**
 • `/activity start/stop` - Controlar servicio
 • `/activity force` - Recomendación inmediata
 • `/activity interval <mins>` - Cambiar frecuencia
-"""
+""")
 
-            return message.strip()
+            return "".join(parts).strip()
 
         except Exception as e:
             return "❌ Error formateando estado del servicio."
@@ -1287,7 +1188,7 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
             status_emoji = "🟢" if is_running else "🔴"
             status_text = "Activo" if is_running else "Detenido"
 
-            message = f"""
+            parts = [f"""
 🤖 **Estado Detallado del Servicio**
 
 {status_emoji} **Estado:** {status_text}
@@ -1305,15 +1206,15 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
 💡 **Comandos:**
 • `/activity force` - Recomendación ahora
 • `/activity interval <mins>` - Cambiar frecuencia
-"""
+"""]
 
             # Agregar info de horarios silenciosos si está disponible
             quiet_hours = status.get('quiet_hours')
             if quiet_hours:
                 quiet_status = "activo" if quiet_hours.get('enabled') else "inactivo"
-                message += f"🌙 **Horarios silenciosos:** {quiet_status}\n"
+                parts.append(f"🌙 **Horarios silenciosos:** {quiet_status}\n")
 
-            return message.strip()
+            return "".join(parts).strip()
 
         except Exception as e:
             # Fallback al formato básico
@@ -1322,17 +1223,14 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     async def _handle_add_chat(self, update, activity_service, chat_id) -> None:
         """Agrega el chat actual a recomendaciones."""
         try:
-            if chat_id in activity_service.active_chats:
+            active = activity_service.active_chats
+            if chat_id in active:
                 await update.message.reply_text("ℹ️ Este chat ya recibe recomendaciones automáticas.")
             else:
                 success = activity_service.add_chat(chat_id)
                 if success:
-                    chat_type = "canal" if update.effective_chat.type == "channel" else "chat"
-                    await update.message.reply_text(
-                        f"✅ **Chat agregado**\n\n"
-                        f"Este {chat_type} ahora recibirá recomendaciones automáticas.\n"
-                        f"📊 Total de chats activos: {len(activity_service.active_chats)}"
-                    )
+                    label = _CHAT_TYPE_LABEL.get(update.effective_chat.type, "chat")
+                    await update.message.reply_text(_ADD_CHAT_MSG.format(label=label, count=len(active)))
                 else:
                     await update.message.reply_text("❌ Error agregando chat.")
         except Exception as e:
@@ -1341,47 +1239,15 @@ Para obtener recomendaciones personalizadas, describe qué tipo de libro te gust
     async def _handle_remove_chat(self, update, activity_service, chat_id) -> None:
         """Remueve el chat actual de recomendaciones."""
         try:
+            active = activity_service.active_chats
             success = activity_service.remove_chat(chat_id)
             if success:
                 await update.message.reply_text(
                     f"🚫 **Chat removido**\n\n"
                     f"Este chat ya no recibirá recomendaciones automáticas.\n"
-                    f"📊 Chats activos restantes: {len(activity_service.active_chats)}"
+                    f"📊 Chats activos restantes: {len(active)}"
                 )
             else:
                 await update.message.reply_text("ℹ️ Este chat no estaba recibiendo recomendaciones.")
         except Exception as e:
             await update.message.reply_text("❌ Error procesando solicitud.")
-
-    # ACTUALIZAR EL MÉTODO HELP EXISTENTE
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Maneja el comando /help."""
-        try:
-            user_id = update.effective_user.id
-            is_developer = self._is_developer(user_id)
-
-            commands = [
-                '/start - Mensaje de bienvenida del bot',
-                '/help - Muestra esta ayuda',
-                '/ebook <nombre> - Busca libros por título',
-                '/list - Lista todos los libros disponibles',
-                '/recommend <preferencias> - Recomendaciones personalizadas',
-                '/about - Información sobre el bot'
-            ]
-
-            # Agregar comandos de desarrollador
-            if is_developer:
-                commands.extend([
-                    '',  # Línea en blanco
-                    '🔧 **Comandos de Administrador:**',
-                    '/activity - Ver estado de recomendaciones automáticas',
-                    '/activity start/stop - Iniciar/detener actividad',
-                    '/activity force - Forzar recomendación inmediata',
-                    '/activity interval <mins> - Cambiar frecuencia'
-                ])
-
-            base_message = self.bot_messages.get('ayuda')
-            message = self.message_formatter.format_help_message(base_message, commands)
-            await self._send_message(update, message, ParseMode.HTML)
-        except Exception as e:
-            await self._handle_error(update, e, "help")
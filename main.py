@@ -8,7 +8,7 @@ import signal
 import sys
 from typing import Optional, Dict, Any
 
-from config.bot_config import get_config, get_logger
+from config.bot_config import configure_logging, get_config, get_logger
 from data.database_connection import get_database
 from zeepubs_bot import ZeepubsBot, create_bot
 from utils.error_handler import log_service_error
@@ -69,9 +69,9 @@ class BotLauncher:
             python_version = sys.version_info
             validation_result['details']['python_version'] = f"{python_version.major}.{python_version.minor}.{python_version.micro}"
 
-            if python_version < (3, 8):
+            if python_version < (3, 10):
                 validation_result['valid'] = False
-                validation_result['errors'].append(f"Python 3.8+ requerido. Actual: {python_version.major}.{python_version.minor}")
+                validation_result['errors'].append(f"Python 3.10+ requerido. Actual: {python_version.major}.{python_version.minor}")
 
             # Validar configuración crítica
             config = get_config()
@@ -213,6 +213,10 @@ class BotLauncher:
                 if 'file_manager' in services and services['file_manager']:
                     services['file_manager'].cleanup_temp_directory()
 
+                # Volcar estadísticas pendientes antes de cerrar la BD
+                if 'book_repository' in services and services['book_repository']:
+                    services['book_repository'].flush()
+
                 # Cerrar conexiones de BD
                 if 'database' in services and services['database']:
                     services['database'].close_all_connections()
@@ -450,6 +454,8 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    configure_logging()
+
     # Detectar modo de ejecución
     mode = os.getenv("BOT_MODE", "production").lower()
 
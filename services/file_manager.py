@@ -203,8 +203,14 @@ class FileManager:
 
             # Agregar tamaño de archivo
             file_size = file_path.stat().st_size
-            if book.file_info:
-                book.file_info.file_size = file_size
+            file_info = book.file_info
+            if file_info:
+                book.update_file_info(
+                    file_info.file_id,
+                    file_unique_id=file_info.file_unique_id,
+                    file_size=file_size,
+                    mime_type=file_info.mime_type
+                )
 
             self.logger.info(f"EPUB procesado exitosamente: {book.title}")
             return book
@@ -13,7 +13,7 @@ from telegram.ext import (
     filters
 )
 from services.auto_activity_service import AutoActivityService
-from config.bot_config import get_config, get_logger, BotConstants
+from config.bot_config import configure_logging, get_config, get_logger, BotConstants
 from data.book_repository import BookRepository
 from data.database_connection import get_database
 from handlers.telegram_handlers import TelegramHandlers
@@ -174,13 +174,23 @@ class ZeepubsBot:
                 "about": self.handlers.about_command,
                 "ebook": self.handlers.book_command,
                 "list": self.handlers.list_command,
-                "recommend": self.handlers.recommend_command,
-                "activity": self.handlers.activity_command
+                "recommend": self.handlers.recommend_command
             }
 
             for command, handler in basic_commands.items():
                 self.application.add_handler(CommandHandler(command, handler))
 
+            # /activity solo para el desarrollador: el filtro descarta el resto antes del dispatch.
+            # block=False: sus respuestas encadenadas no retienen las demás actualizaciones
+            self.application.add_handler(
+                CommandHandler(
+                    "activity",
+                    self.handlers.activity_command,
+                    filters=filters.User(user_id=self.config.developer_chat_id),
+                    block=False
+                )
+            )
+
             # *** AGREGAR ESTA LÍNEA NUEVA ***
             # Handler especial para inicializar actividad automática
             self.application.add_handler(CommandHandler("init_activity", self._init_activity_handler))
@@ -193,21 +203,21 @@ class ZeepubsBot:
             self.application.add_handler(
                 CallbackQueryHandler(
                     self.handlers.pagination_callback,
-                    pattern=BotConstants.CHARACTER_PATTERN
+                    pattern=BotConstants.CHARACTER_RE
                 )
             )
 
             self.application.add_handler(
                 CallbackQueryHandler(
                     self.handlers.download_callback,
-                    pattern=BotConstants.DOWNLOAD_PATTERN
+                    pattern=BotConstants.DOWNLOAD_RE
                 )
             )
 
             # Comandos dinámicos para libros
             dynamic_count = self._register_dynamic_commands()
 
-            self.logger.info(f"✅ Handlers registrados - {len(basic_commands) + 1} básicos, {dynamic_count} dinámicos")
+            self.logger.info(f"✅ Handlers registrados - {len(basic_commands) + 2} básicos, {dynamic_count} dinámicos")
             return True
 
         except Exception as e:
@@ -402,6 +412,10 @@ class ZeepubsBot:
             if self.file_manager:
                 self.file_manager.cleanup_temp_directory()
 
+            # Volcar estadísticas pendientes antes de cerrar la BD
+            if self.book_repository:
+                self.book_repository.flush()
+
             # Cerrar conexiones de BD
             if self.database:
                 self.database.close_all_connections()
@@ -512,6 +526,9 @@ def create_bot() -> Optional[ZeepubsBot]:
 
 def main() -> None:
     """Función principal para ejecutar el bot."""
+    # Idempotente: main.py ya lo invoca, pero `python zeepubs_bot.py` también es un punto de entrada
+    configure_logging()
+
     try:
         # Crear e inicializar bot
         bot = create_bot()